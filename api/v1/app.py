@@ -2,13 +2,15 @@
 """
 App initialzation and set up
 """
-from flask import Flask, make_response, jsonify
-from models import storage
+from flask import Flask, make_response, jsonify, request, g
+from models import storage, storage_t
+from api.v1.encoder import ModelJSONProvider
 from api.v1.views import app_views
 from flask_cors import CORS
 
 
 app = Flask(__name__)
+app.json = ModelJSONProvider(app)
 CORS(app, resources={r"/*": {"origins": "0.0.0.0"}})
 app.register_blueprint(app_views)
 
@@ -19,10 +21,25 @@ def not_found(error):
     return make_response(jsonify({'error': 'Not found'}), 404)
 
 
+if storage_t != "db":
+    @app.before_request
+    def pin_snapshot():
+        """Makes the request read the objects as they are when it starts"""
+        storage.pin()
+else:
+    @app.before_request
+    def route_writes():
+        """Makes a request that may write read from the primary database"""
+        if request.method not in ("GET", "HEAD", "OPTIONS"):
+            storage.use_primary()
+
+
 @app.teardown_appcontext
 def teardown_db(exception):
-    """Closes the database session after each request"""
-    storage.close()
+    """Closes the database session after each request, unless its response
+    is streamed and closes it when the stream ends"""
+    if not g.get("streaming"):
+        storage.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,44 @@
+#!/usr/bin/python3
+"""
+Encodes the JSON of the API with orjson when it is installed, and with
+the json module of the standard library otherwise
+"""
+from datetime import datetime
+from flask.json.provider import DefaultJSONProvider
+import json
+from models.base_model import time
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ModelJSONProvider(DefaultJSONProvider):
+    """The JSON provider of the API, encoding the datetimes of the model
+    dicts in the format of to_dict() without formatting them first"""
+    fast = orjson is not None
+
+    @staticmethod
+    def default(obj):
+        """returns a value the encoder can serialize in place of obj"""
+        if isinstance(obj, datetime):
+            return obj.strftime(time)
+        return DefaultJSONProvider.default(obj)
+
+    def dumps(self, obj, **kwargs):
+        """returns obj encoded as a JSON string"""
+        if not self.fast:
+            return super().dumps(obj, **kwargs)
+        # orjson leaves out zero microseconds: format datetimes in default
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        """returns the object the JSON string s encodes"""
+        if not self.fast:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
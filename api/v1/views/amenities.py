@@ -2,6 +2,9 @@
 """Handles all RESTFul API actions for amenity object"""
 from flask import jsonify, abort, make_response, request
 from api.v1.views import app_views
+from api.v1.views.fields import requested_fields
+from api.v1.views.paging import page_of
+from api.v1.views.stream import jsonify_stream
 from models import storage
 from models.amenity import Amenity
 from datetime import datetime
@@ -10,19 +13,21 @@ from datetime import datetime
 @app_views.route('/amenities', methods=['GET'], strict_slashes=False)
 def get_amenities():
     """Retrieve the list of all amenity objects"""
-    amenities = storage.all(Amenity).values()
-    amenities_list = [amenity.to_dict() for amenity in amenities]
-    return jsonify(amenities_list)
+    if "limit" in request.args:
+        return page_of(Amenity)
+    fields = requested_fields()
+    return jsonify_stream(storage.iter_all(Amenity, fields=fields),
+                          fields=fields)
 
 
 @app_views.route(
         '/amenities/<amenity_id>', methods=['GET'], strict_slashes=False)
 def get_amenity(amenity_id):
     """Retrieves an amenity object"""
-    amenity = storage.get(Amenity, amenity_id)
+    amenity = storage.get(Amenity, amenity_id, fields=requested_fields())
     if not amenity:
         abort(404)
-    return jsonify(amenity.to_dict())
+    return jsonify(amenity.to_dict(requested_fields(), datetimes=True))
 
 
 @app_views.route(
@@ -48,7 +53,7 @@ def post_amenity():
 
     amenity = Amenity(**data)
     amenity.save()
-    return make_response(jsonify(amenity.to_dict()), 201)
+    return make_response(jsonify(amenity.to_dict(datetimes=True)), 201)
 
 
 @app_views.route(
@@ -68,4 +73,4 @@ def put_amenity(amenity_id):
             setattr(amenity, key, value)
     amenity.updated_at = datetime.utcnow()
     storage.save()
-    return make_response(jsonify(amenity.to_dict()), 200)
+    return make_response(jsonify(amenity.to_dict(datetimes=True)), 200)
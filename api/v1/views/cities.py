@@ -2,6 +2,8 @@
 """Handles all RESTFul API actions for state object"""
 from flask import jsonify, abort, make_response, request
 from api.v1.views import app_views
+from api.v1.views.fields import requested_fields
+from api.v1.views.paging import page_of
 from models import storage
 from models.state import State
 from models.city import City
@@ -15,24 +17,22 @@ def get_cities(state_id):
     state = storage.get(State, state_id)
     if state is None:
         abort(404)
+    if "limit" in request.args:
+        return page_of(City, "state_id", state.id)
 
-    cities = storage.all(City).values()
-    cities_list = []
-    if cities:
-        cities_list = [
-            city.to_dict() for city in cities if city.state_id == state_id]
-    if cities_list is None:
-        abort(404)
+    fields = requested_fields()
+    cities_list = [city.to_dict(fields, datetimes=True)
+                   for city in state.cities]
     return jsonify(cities_list)
 
 
 @app_views.route('/cities/<city_id>', methods=['GET'], strict_slashes=False)
 def get_city(city_id):
     """Retrieves a city object"""
-    city = storage.get(City, city_id)
+    city = storage.get(City, city_id, fields=requested_fields())
     if not city:
         abort(404)
-    return jsonify(city.to_dict())
+    return jsonify(city.to_dict(requested_fields(), datetimes=True))
 
 
 @app_views.route(
@@ -64,7 +64,7 @@ def post_city(state_id):
     city = City(**data)
     city.state_id = state_id
     city.save()
-    return make_response(jsonify(city.to_dict()), 201)
+    return make_response(jsonify(city.to_dict(datetimes=True)), 201)
 
 
 @app_views.route('/cities/<city_id>', methods=['PUT'], strict_slashes=False)
@@ -83,4 +83,4 @@ def put_city(city_id):
             setattr(city, key, value)
     city.updated_at = datetime.utcnow()
     storage.save()
-    return make_response(jsonify(city.to_dict()), 200)
+    return make_response(jsonify(city.to_dict(datetimes=True)), 200)
@@ -0,0 +1,11 @@
+#!/usr/bin/python3
+"""Reads the sparse fieldset of a request"""
+from flask import request
+
+
+def requested_fields():
+    """Returns the attributes listed by ?fields=id,name, or None when the
+    request wants all of them"""
+    if "fields" not in request.args:
+        return None
+    return [field for field in request.args["fields"].split(",") if field]
@@ -3,7 +3,7 @@
 Define the api status and stats views
 """
 from api.v1.views import app_views
-from flask import jsonify
+from flask import jsonify, request
 from models import storage
 from models.user import User
 from models.place import Place
@@ -22,12 +22,15 @@ def status():
 @app_views.route('/stats', methods=['GET'], strict_slashes=False)
 def stats():
     """Retrieves the number of each objects by type"""
+    counts = storage.count_many(
+        [Amenity, City, Place, Review, State, User],
+        approximate=request.args.get("approximate") == "1")
     objs_by_type = {
-        "amenities": storage.count(Amenity),
-        "cities": storage.count(City),
-        "places": storage.count(Place),
-        "reviews": storage.count(Review),
-        "states": storage.count(State),
-        "users": storage.count(User)
+        "amenities": counts["Amenity"],
+        "cities": counts["City"],
+        "places": counts["Place"],
+        "reviews": counts["Review"],
+        "states": counts["State"],
+        "users": counts["User"]
     }
     return jsonify(objs_by_type)
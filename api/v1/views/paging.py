@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""Lists objects a page at a time with ?limit=&after=&order="""
+from api.v1.views.fields import requested_fields
+from flask import abort, jsonify, make_response, request
+from models import storage
+from models.engine.pagination import ORDERS, paginate
+from urllib.parse import urlencode
+
+
+def bad_request(error):
+    """Aborts the request with a 400 error"""
+    abort(make_response(jsonify({"error": error}), 400))
+
+
+def page_args(cls):
+    """Returns the limit, cursor and order of the query string, aborting
+    when one is invalid"""
+    try:
+        limit = int(request.args["limit"])
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        bad_request("Invalid limit")
+    order = request.args.get("order", "created_at")
+    if order != "created_at" and (order not in ORDERS or
+                                  not hasattr(cls, order)):
+        bad_request("Invalid order")
+    return limit, request.args.get("after"), order
+
+
+def jsonify_page(objs, next, fields=None):
+    """Returns the response listing objs, with only the keys listed in
+    fields if given, linking to the next page when there is one"""
+    response = jsonify([obj.to_dict(fields, datetimes=True) for obj in objs])
+    if next is not None:
+        args = request.args.to_dict()
+        args["after"] = next
+        response.headers["Link"] = '<{}?{}>; rel="next"'.format(
+            request.base_url, urlencode(args))
+    return response
+
+
+def page_of(cls, attr=None, value=None):
+    """Returns the response listing a page of the objects of cls, whose
+    attribute attr equals value if given"""
+    limit, after, order = page_args(cls)
+    fields = requested_fields()
+    try:
+        objs, next = storage.page(cls, limit, after, order, attr, value,
+                                  fields)
+    except ValueError:
+        bad_request("Invalid cursor")
+    return jsonify_page(objs, next, fields)
+
+
+def page_from(cls, objs):
+    """Returns the response listing a page of objs, objects of cls"""
+    limit, after, order = page_args(cls)
+    try:
+        objs, next = paginate(objs, limit, after, order)
+    except ValueError:
+        bad_request("Invalid cursor")
+    return jsonify_page(objs, next, requested_fields())
@@ -2,11 +2,15 @@
 """Handles all RESTFul API actions for place object"""
 from flask import jsonify, abort, make_response, request
 from api.v1.views import app_views
+from api.v1.views.fields import requested_fields
+from api.v1.views.paging import page_from, page_of
+from api.v1.views.stream import jsonify_stream
 from models import storage
 from models.user import User
 from models.state import State
 from models.city import City
 from models.place import Place
+from models.amenity import Amenity
 from datetime import datetime
 
 
@@ -17,24 +21,22 @@ def get_places(city_id):
     city = storage.get(City, city_id)
     if city is None:
         abort(404)
+    if "limit" in request.args:
+        return page_of(Place, "city_id", city.id)
 
-    places = storage.all(Place).values()
-    places_list = []
-    if places:
-        places_list = [
-            place.to_dict() for place in places if place.city_id == city_id]
-    if places_list is None:
-        abort(404)
+    fields = requested_fields()
+    places_list = [place.to_dict(fields, datetimes=True)
+                   for place in city.places]
     return jsonify(places_list)
 
 
 @app_views.route('/places/<place_id>', methods=['GET'], strict_slashes=False)
 def get_place(place_id):
     """Retrieves a place object"""
-    place = storage.get(Place, place_id)
+    place = storage.get(Place, place_id, fields=requested_fields())
     if not place:
         abort(404)
-    return jsonify(place.to_dict())
+    return jsonify(place.to_dict(requested_fields(), datetimes=True))
 
 
 @app_views.route(
@@ -72,7 +74,7 @@ def post_place(city_id):
     place = Place(**data)
     place.city_id = city_id
     place.save()
-    return make_response(jsonify(place.to_dict()), 201)
+    return make_response(jsonify(place.to_dict(datetimes=True)), 201)
 
 
 @app_views.route('/places/<place_id>', methods=['PUT'], strict_slashes=False)
@@ -93,7 +95,7 @@ def put_place(place_id):
 
     place.updated_at = datetime.utcnow()
     storage.save()
-    return make_response(jsonify(place.to_dict()), 200)
+    return make_response(jsonify(place.to_dict(datetimes=True)), 200)
 
 
 @app_views.route('/places_search', methods=['POST'], strict_slashes=False)
@@ -103,33 +105,37 @@ def places_search():
     if data is None:
         return jsonify({"error": "Not a JSON"}), 400
 
-    states = data.get("states", [])
-    cities = data.get("cities", [])
-    amenities = data.get("amenities", [])
+    places = search(data.get("states", []), data.get("cities", []),
+                    data.get("amenities", []))
+    if "limit" in request.args:
+        return page_from(Place, places)
+    return jsonify_stream(places, fields=requested_fields())
+
 
-    if not states and not cities and not amenities:
-        places = storage.all(Place).values()
+def search(states, cities, amenities):
+    """Yields the places in the states or cities that have all the
+    amenities, querying the storage only as the response is streamed"""
+    load = ("amenities",) if amenities else ()
+    if not states and not cities:
+        places = storage.iter_all(Place, load=load)
     else:
         places = set()
 
         # Get places from states
-        for state_id in states:
-            state = storage.get(State, state_id)
-            if state:
-                for city in state.cities:
-                    places.update(city.places)
+        state_load = [".".join(("cities.places",) + load)]
+        for state in storage.get_many(State, states, load=state_load):
+            for city in state.cities:
+                places.update(city.places)
 
         # Get places from cities
-        for city_id in cities:
-            city = storage.get(City, city_id)
-            if city:
-                places.update(city.places)
+        city_load = [".".join(("places",) + load)]
+        for city in storage.get_many(City, cities, load=city_load):
+            places.update(city.places)
 
     # Apply amenities filter
     if amenities:
-        amenity_objects = [
-                storage.get(Amenity, amenity_id) for amenity_id in amenities]
-        amenity_objects = [a for a in amenity_objects if a]
-        places = [place for place in places if all(a in place.amenities for a in amenity_objects)]
+        amenity_objects = storage.get_many(Amenity, amenities)
+        places = (place for place in places
+                  if all(a in place.amenities for a in amenity_objects))
 
-    return jsonify([place.to_dict() for place in places])
+    yield from places
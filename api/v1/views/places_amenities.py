@@ -2,10 +2,11 @@
 """Handles all RESTFul API actions for places amenity objects"""
 from flask import jsonify, abort, make_response
 from api.v1.views import app_views
+from api.v1.views.fields import requested_fields
+import models
 from models import storage
 from models.place import Place
 from models.amenity import Amenity
-from os import getenv
 
 
 @app_views.route(
@@ -16,15 +17,16 @@ def get_place_amenities(place_id):
     if place is None:
         abort(404)
 
-    if getenv('HBNB_TYPE_STORAGE', 'default_storage') == 'db':
+    fields = requested_fields()
+    if models.storage_t == 'db':
         amenities_list = [
-                amenity.to_dict()
+                amenity.to_dict(fields, datetimes=True)
                 for amenity in place.amenities if amenity
         ]
     else:
         amenities_list = [
-            storage.get(Amenity, amty_id).to_dict()
-            for amty_id in place.amenity_ids if storage.get(Amenity, amty_id)
+            amenity.to_dict(fields, datetimes=True)
+            for amenity in storage.get_many(Amenity, place.amenity_ids)
         ]
 
     return jsonify(amenities_list)
@@ -43,14 +45,16 @@ def delete_place_amenity(place_id, amenity_id):
     if amenity is None:
         abort(404)
 
-    if getenv('HBNB_TYPE_STORAGE', 'default_storage') == 'db':
+    if models.storage_t == 'db':
         if amenity not in place.amenities:
             abort(404)
         place.amenities.remove(amenity)
     else:
         if amenity_id not in place.amenity_ids:
             abort(404)
-        place.amenity_ids.remove(amenity_id)
+        place.amenity_ids = [
+            amty_id for amty_id in place.amenity_ids if amty_id != amenity_id
+        ]
 
     storage.save()
     return make_response(jsonify({}), 200)
@@ -69,14 +73,14 @@ def post_place_amenity(place_id, amenity_id):
     if amenity is None:
         abort(404)
 
-    if getenv('HBNB_TYPE_STORAGE', 'default_storage') == 'db':
+    if models.storage_t == 'db':
         if amenity in place.amenities:
-            return make_response(jsonify(amenity.to_dict()), 200)
+            return make_response(jsonify(amenity.to_dict(datetimes=True)), 200)
         place.amenities.append(amenity)
     else:
         if amenity_id in place.amenity_ids:
-            return make_response(jsonify(amenity.to_dict()), 200)
-        place.amenity_ids.append(amenity_id)
+            return make_response(jsonify(amenity.to_dict(datetimes=True)), 200)
+        place.amenity_ids = place.amenity_ids + [amenity_id]
 
     storage.save()
-    return make_response(jsonify(amenity.to_dict()), 201)
+    return make_response(jsonify(amenity.to_dict(datetimes=True)), 201)
@@ -2,6 +2,8 @@
 """Handles all RESTFul API actions for places rewiew object"""
 from flask import jsonify, abort, make_response, request
 from api.v1.views import app_views
+from api.v1.views.fields import requested_fields
+from api.v1.views.paging import page_of
 from models import storage
 from models.user import User
 from models.place import Place
@@ -16,24 +18,22 @@ def get_reviews(place_id):
     place = storage.get(Place, place_id)
     if place is None:
         abort(404)
+    if "limit" in request.args:
+        return page_of(Review, "place_id", place.id)
 
-    reviews = storage.all(Review).values()
-    reviews_list = []
-    if reviews:
-        reviews_list = [
-            revw.to_dict() for revw in reviews if revw.place_id == place_id]
-    if reviews_list is None:
-        abort(404)
+    fields = requested_fields()
+    reviews_list = [review.to_dict(fields, datetimes=True)
+                    for review in place.reviews]
     return jsonify(reviews_list)
 
 
 @app_views.route('/reviews/<review_id>', methods=['GET'], strict_slashes=False)
 def get_review(review_id):
     """Retrieves a review object"""
-    review = storage.get(Review, review_id)
+    review = storage.get(Review, review_id, fields=requested_fields())
     if not review:
         abort(404)
-    return jsonify(review.to_dict())
+    return jsonify(review.to_dict(requested_fields(), datetimes=True))
 
 
 @app_views.route(
@@ -71,7 +71,7 @@ def post_review(place_id):
     review = Review(**data)
     review.place_id = place_id
     review.save()
-    return make_response(jsonify(review.to_dict()), 201)
+    return make_response(jsonify(review.to_dict(datetimes=True)), 201)
 
 
 @app_views.route('/reviews/<review_id>', methods=['PUT'], strict_slashes=False)
@@ -92,4 +92,4 @@ def put_review(review_id):
 
     review.updated_at = datetime.utcnow()
     storage.save()
-    return make_response(jsonify(review.to_dict()), 200)
+    return make_response(jsonify(review.to_dict(datetimes=True)), 200)
@@ -2,6 +2,9 @@
 """Handles all RESTFul API actions for state object"""
 from flask import jsonify, abort, make_response, request
 from api.v1.views import app_views
+from api.v1.views.fields import requested_fields
+from api.v1.views.paging import page_of
+from api.v1.views.stream import jsonify_stream
 from models import storage
 from models.state import State
 from datetime import datetime
@@ -10,18 +13,20 @@ from datetime import datetime
 @app_views.route('/states', methods=['GET'], strict_slashes=False)
 def get_states():
     """Retrieve the list of all state objects"""
-    states = storage.all(State).values()
-    states_list = [state.to_dict() for state in states]
-    return jsonify(states_list)
+    if "limit" in request.args:
+        return page_of(State)
+    fields = requested_fields()
+    return jsonify_stream(storage.iter_all(State, fields=fields),
+                          fields=fields)
 
 
 @app_views.route('/states/<state_id>', methods=['GET'], strict_slashes=False)
 def get_state(state_id):
     """Retrieves a state object"""
-    state = storage.get(State, state_id)
+    state = storage.get(State, state_id, fields=requested_fields())
     if not state:
         abort(404)
-    return jsonify(state.to_dict())
+    return jsonify(state.to_dict(requested_fields(), datetimes=True))
 
 
 @app_views.route(
@@ -46,7 +51,7 @@ def post_state():
         return jsonify({"error": "Missing name"}), 400
     state = State(**data)
     state.save()
-    return make_response(jsonify(state.to_dict()), 201)
+    return make_response(jsonify(state.to_dict(datetimes=True)), 201)
 
 
 @app_views.route('/states/<state_id>', methods=['PUT'], strict_slashes=False)
@@ -65,4 +70,4 @@ def put_state(state_id):
             setattr(state, key, value)
     state.updated_at = datetime.utcnow()
     storage.save()
-    return make_response(jsonify(state.to_dict()), 200)
+    return make_response(jsonify(state.to_dict(datetimes=True)), 200)
@@ -0,0 +1,37 @@
+#!/usr/bin/python3
+"""Streams lists of objects as JSON arrays"""
+from flask import Response, current_app, g
+from models import storage, storage_t
+
+
+def jsonify_stream(objs, chunk=100, fields=None):
+    """Returns a response streaming the dictionaries of objs, with only
+    the keys listed in fields if given, as a JSON array, chunk objects at
+    a time, without building the list first
+
+    The body is streamed after the request is torn down: objs must be a
+    generator that only queries the storage as it is iterated. The stream
+    reads its own snapshot, or session, and closes it once it ends."""
+    dumps = current_app.json.dumps
+    g.streaming = True
+
+    def generate():
+        """yields the array in pieces"""
+        if storage_t != "db":
+            storage.pin()
+        try:
+            parts = ["["]
+            count = 0
+            for obj in objs:
+                if count:
+                    parts.append(", ")
+                parts.append(dumps(obj.to_dict(fields, datetimes=True)))
+                count += 1
+                if count % chunk == 0:
+                    yield "".join(parts)
+                    parts = []
+            parts.append("]\n")
+            yield "".join(parts)
+        finally:
+            storage.close()
+    return Response(generate(), mimetype="application/json")
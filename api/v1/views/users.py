@@ -2,6 +2,9 @@
 """Handles all RESTFul API actions for user object"""
 from flask import jsonify, abort, make_response, request
 from api.v1.views import app_views
+from api.v1.views.fields import requested_fields
+from api.v1.views.paging import page_of
+from api.v1.views.stream import jsonify_stream
 from models import storage
 from models.user import User
 from datetime import datetime
@@ -10,18 +13,20 @@ from datetime import datetime
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
 def get_users():
     """Retrieve the list of all user objects"""
-    users = storage.all(User).values()
-    users_list = [user.to_dict() for user in users]
-    return jsonify(users_list)
+    if "limit" in request.args:
+        return page_of(User)
+    fields = requested_fields()
+    return jsonify_stream(storage.iter_all(User, fields=fields),
+                          fields=fields)
 
 
 @app_views.route('/users/<user_id>', methods=['GET'], strict_slashes=False)
 def get_user(user_id):
     """Retrieves a user object"""
-    user = storage.get(User, user_id)
+    user = storage.get(User, user_id, fields=requested_fields())
     if not user:
         abort(404)
-    return jsonify(user.to_dict())
+    return jsonify(user.to_dict(requested_fields(), datetimes=True))
 
 
 @app_views.route('/users/<user_id>', methods=['DELETE'], strict_slashes=False)
@@ -49,7 +54,7 @@ def post_user():
     user = User(**data)
     user.save()
     storage.save()
-    return make_response(jsonify(user.to_dict()), 201)
+    return make_response(jsonify(user.to_dict(datetimes=True)), 201)
 
 
 @app_views.route('/users/<user_id>', methods=['PUT'], strict_slashes=False)
@@ -68,4 +73,4 @@ def put_user(user_id):
             setattr(user, key, value)
     user.updated_at = datetime.utcnow()
     storage.save()
-    return make_response(jsonify(user.to_dict()), 200)
+    return make_response(jsonify(user.to_dict(datetimes=True)), 200)
@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+"""
+Measures the time to store growing numbers of new objects with
+bulk_new() and bulk_save(), against one save() per object on the first
+1000 of them, with the storage selected by HBNB_TYPE_STORAGE; the one by
+one column extrapolates those 1000 saves
+
+usage: ./benchmarks/bulk_insert.py [count ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import models
+from models.state import State
+
+
+def open_storage(tmp):
+    """returns an empty storage keeping its files in tmp"""
+    if models.storage_t == "db":
+        from models.engine.sqlite_storage import SQLiteStorage
+        os.environ["HBNB_SQLITE_DB"] = os.path.join(tmp, "hbnb.db")
+        storage = SQLiteStorage()
+        storage.reload()
+        return storage
+    from models.engine.file_storage import FileStorage
+    return FileStorage(os.path.join(tmp, "file.json"))
+
+
+def bench(count, bulk):
+    """returns the seconds taken to store count new states"""
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = open_storage(tmp)
+        states = [State(name="state {}".format(i)) for i in range(count)]
+        start = time.perf_counter()
+        if bulk:
+            storage.bulk_new(states)
+            storage.bulk_save()
+        else:
+            for state in states:
+                storage.new(state)
+                storage.save()
+        elapsed = time.perf_counter() - start
+        storage.close()
+    return elapsed
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000]
+    one = bench(1000, False) / 1000
+    print("{}: {:.3f} ms per object with one save() each".format(
+        models.storage_t or "file", one * 1000))
+    print("{:>10} {:>12} {:>16}".format("objects", "bulk s", "one by one s"))
+    for count in counts:
+        print("{:>10} {:>12.2f} {:>15.0f}~".format(
+            count, bench(count, True), one * count))
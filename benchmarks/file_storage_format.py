@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""
+Compares the size, save time and load time of the JSON and binary
+(HBNB_FILE_FORMAT=binary) snapshots of FileStorage
+
+usage: ./benchmarks/file_storage_format.py [count ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+
+def timed(func):
+    """returns the seconds taken by func()"""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def bench(count, format):
+    """returns the size, save, eager load and lazy load of count places"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "file.json")
+        storage = FileStorage(path, format=format)
+        for i in range(count):
+            storage.new(Place(name="place {}".format(i), city_id="c",
+                              user_id="u", description="a nice place " * 8,
+                              number_rooms=2, max_guest=4, latitude=37.77,
+                              longitude=-122.41, amenity_ids=[]))
+        save = timed(storage.compact)
+        size = sum(os.path.getsize(os.path.join(tmp, name))
+                   for name in os.listdir(tmp))
+        load = timed(FileStorage(path, format=format).reload)
+        lazy = timed(FileStorage(path, format=format, lazy=True).reload)
+    return size, save, load, lazy
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    print("{:>10} {:>7} {:>9} {:>9} {:>9} {:>9}".format(
+        "objects", "format", "size MiB", "save ms", "load ms", "lazy ms"))
+    for count in counts:
+        for format in ("json", "binary"):
+            size, save, load, lazy = bench(count, format)
+            print("{:>10} {:>7} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f}".format(
+                count, format, size / 2 ** 20, save * 1000, load * 1000,
+                lazy * 1000))
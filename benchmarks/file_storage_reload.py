@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+"""
+Compares the cold start time and peak memory of reloading file.json
+eagerly, lazily (HBNB_FILE_LAZY=1) and from 8 hash shards per class
+(HBNB_FILE_SHARDS=8), parsed in this process or by 4 forked workers
+(HBNB_FILE_RELOAD_WORKERS=4), each in a fresh process
+
+usage: ./benchmarks/file_storage_reload.py [count ...]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+CHILD = """
+import resource, sys, time
+import models
+from models.engine.file_storage import FileStorage
+from models.place import Place
+FileStorage._FileStorage__file_path = sys.argv[1]
+start = time.perf_counter()
+models.storage.reload()
+models.storage.get(Place, sys.argv[2])
+if sys.argv[3:]:
+    models.storage.compact()
+elapsed = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(elapsed, rss)
+"""
+
+
+def write_places(path, count):
+    """writes count place records to path in the file.json layout"""
+    with open(path, "w") as f:
+        f.write("{")
+        for i in range(count):
+            place_id = "{:08d}-0000-0000-0000-000000000000".format(i)
+            record = {"__class__": "Place", "id": place_id,
+                      "created_at": "2017-09-28T21:03:54.052298",
+                      "updated_at": "2017-09-28T21:03:54.052302",
+                      "city_id": "c", "user_id": "u",
+                      "name": "place {}".format(i),
+                      "description": "a nice place " * 8,
+                      "number_rooms": 2, "number_bathrooms": 1,
+                      "max_guest": 4, "price_by_night": 80,
+                      "latitude": 37.77, "longitude": -122.41,
+                      "amenity_ids": []}
+            f.write("{}{}: {}".format(", " if i else "",
+                                      json.dumps("Place." + place_id),
+                                      json.dumps(record)))
+        f.write("}")
+    return "{:08d}-0000-0000-0000-000000000000".format(count // 2)
+
+
+def run(path, place_id, lazy="0", shards="0", workers="0", compact=False):
+    """returns the reload seconds and peak RSS in KiB of a fresh process"""
+    env = dict(os.environ, PYTHONPATH=ROOT, HBNB_FILE_LAZY=lazy,
+               HBNB_FILE_SHARDS=shards, HBNB_FILE_RELOAD_WORKERS=workers)
+    env.pop("HBNB_TYPE_STORAGE", None)
+    args = [sys.executable, "-c", CHILD, path, place_id]
+    if compact:
+        args.append("compact")
+    out = subprocess.check_output(args, env=env, cwd=os.path.dirname(path))
+    elapsed, rss = out.split()
+    return float(elapsed), int(rss)
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    print("{:>10} {:>10} {:>10} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        "objects", "eager ms", "lazy ms", "shards ms", "workers ms",
+        "eager MiB", "lazy MiB", "shards MiB"))
+    for count in counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.json")
+            place_id = write_places(path, count)
+            eager = run(path, place_id)
+            lazy = run(path, place_id, lazy="1")
+            run(path, place_id, shards="8", compact=True)
+            sharded = run(path, place_id, shards="8")
+            workers = run(path, place_id, shards="8", workers="4")
+        print("{:>10} {:>10.1f} {:>10.1f} {:>10.1f} {:>10.1f} {:>10.1f} "
+              "{:>10.1f} {:>10.1f}".format(
+                  count, eager[0] * 1000, lazy[0] * 1000, sharded[0] * 1000,
+                  workers[0] * 1000, eager[1] / 1024, lazy[1] / 1024,
+                  sharded[1] / 1024))
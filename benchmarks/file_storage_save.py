@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+"""
+Measures the latency of a single save() with FileStorage rewriting
+file.json, appending to the journal or deferring the write to the
+background thread, for growing numbers of objects
+
+usage: ./benchmarks/file_storage_save.py [count ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import models
+from models.engine.file_storage import FileStorage
+from models.state import State
+
+
+def bench(count, journal, flush_ms=0, saves=5):
+    """returns the mean seconds per save() with count stored objects"""
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = FileStorage(os.path.join(tmp, "file.json"),
+                              journal=journal, compact_every=10 ** 9,
+                              flush_ms=flush_ms)
+        models.storage = storage
+        for i in range(count):
+            storage.new(State(name="state {}".format(i)))
+        storage.compact()
+        state = State(name="bench")
+        start = time.perf_counter()
+        for i in range(saves):
+            state.name = "bench {}".format(i)
+            state.save()
+        elapsed = time.perf_counter() - start
+        storage.flush()
+    return elapsed / saves
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000]
+    print("{:>10} {:>14} {:>14} {:>16}".format(
+        "objects", "file.json ms", "journal ms", "write-behind ms"))
+    for count in counts:
+        print("{:>10} {:>14.3f} {:>14.3f} {:>16.3f}".format(
+            count, bench(count, False) * 1000, bench(count, True) * 1000,
+            bench(count, False, 1000) * 1000))
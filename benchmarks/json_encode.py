@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+"""
+Measures the time to encode the response listing growing numbers of
+places: dicts formatted with strftime and encoded by the default JSON
+provider of Flask, against dicts keeping their datetimes encoded by the
+provider of the API with the standard json module and with orjson
+
+usage: ./benchmarks/json_encode.py [count ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from api.v1.app import app
+from api.v1.encoder import ModelJSONProvider, orjson
+from flask.json.provider import DefaultJSONProvider
+from models.place import Place
+
+
+def bench(places, provider, datetimes):
+    """returns the seconds taken to build and encode the list of places"""
+    start = time.perf_counter()
+    with app.app_context():
+        provider.response([place.to_dict(datetimes=datetimes)
+                           for place in places])
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    fast = ModelJSONProvider(app)
+    slow = ModelJSONProvider(app)
+    slow.fast = False
+    runs = [("strftime ms", DefaultJSONProvider(app), False),
+            ("stdlib ms", slow, True)]
+    if orjson is not None:
+        runs.append(("orjson ms", fast, True))
+    print("{:>10}".format("places") +
+          "".join("{:>13}".format(name) for name, _, _ in runs))
+    for count in counts:
+        places = [Place(name="place {}".format(i), city_id="c", user_id="u",
+                        description="a nice place " * 8, number_rooms=2,
+                        max_guest=4, latitude=37.77, longitude=-122.41)
+                  for i in range(count)]
+        print("{:>10}".format(count) + "".join(
+            "{:>13.1f}".format(bench(places, provider, datetimes) * 1000)
+            for _, provider, datetimes in runs))
@@ -5,11 +5,16 @@ initialize the models package
 from os import getenv
 
 
-storage_t = getenv("HBNB_TYPE_STORAGE")
+engine_t = getenv("HBNB_TYPE_STORAGE")
+# every database engine uses the SQLAlchemy mapping of the models
+storage_t = "db" if engine_t == "sqlite" else engine_t
 
-if storage_t == "db":
+if engine_t == "db":
     from models.engine.db_storage import DBStorage
     storage = DBStorage()
+elif engine_t == "sqlite":
+    from models.engine.sqlite_storage import SQLiteStorage
+    storage = SQLiteStorage()
 else:
     from models.engine.file_storage import FileStorage
     storage = FileStorage()
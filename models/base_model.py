@@ -23,29 +23,40 @@ class BaseModel:
     """The BaseModel class from which future classes will be derived"""
     if models.storage_t == "db":
         id = Column(String(60), primary_key=True)
-        created_at = Column(DateTime, default=datetime.utcnow)
+        created_at = Column(DateTime, default=datetime.utcnow, index=True)
         updated_at = Column(DateTime, default=datetime.utcnow)
 
     def __init__(self, *args, **kwargs):
         """Initialization of the base model"""
+        attrs = {}
         if kwargs:
             for key, value in kwargs.items():
                 if key != "__class__":
-                    setattr(self, key, value)
-            if kwargs.get("created_at", None) and type(self.created_at) is str:
-                self.created_at = datetime.strptime(kwargs["created_at"], time)
-            else:
-                self.created_at = datetime.utcnow()
-            if kwargs.get("updated_at", None) and type(self.updated_at) is str:
-                self.updated_at = datetime.strptime(kwargs["updated_at"], time)
-            else:
-                self.updated_at = datetime.utcnow()
-            if kwargs.get("id", None) is None:
-                self.id = str(uuid.uuid4())
+                    attrs[key] = value
+            for key in ("created_at", "updated_at"):
+                if attrs.get(key) and type(attrs[key]) is str:
+                    attrs[key] = datetime.fromisoformat(attrs[key])
+                elif type(attrs.get(key)) is not datetime:
+                    attrs[key] = datetime.utcnow()
+            if attrs.get("id") is None:
+                attrs["id"] = str(uuid.uuid4())
         else:
-            self.id = str(uuid.uuid4())
-            self.created_at = datetime.utcnow()
-            self.updated_at = self.created_at
+            attrs["id"] = str(uuid.uuid4())
+            attrs["created_at"] = datetime.utcnow()
+            attrs["updated_at"] = attrs["created_at"]
+        if models.storage_t == "db":
+            for key, value in attrs.items():
+                setattr(self, key, value)
+        else:
+            # no storage holds the object yet: skip the __setattr__ hook
+            self.__dict__.update(attrs)
+
+    if models.storage_t != "db":
+        def __setattr__(self, name, value):
+            """sets an attribute and lets the storage keep its indexes"""
+            old = getattr(self, name, None)
+            super().__setattr__(name, value)
+            models.storage.changed(self, name, old)
 
     def __str__(self):
         """String representation of the BaseModel class"""
@@ -58,17 +69,26 @@ class BaseModel:
         models.storage.new(self)
         models.storage.save()
 
-    def to_dict(self):
-        """returns a dictionary containing all keys/values of the instance"""
-        new_dict = self.__dict__.copy()
-        if "created_at" in new_dict:
+    def to_dict(self, fields=None, datetimes=False):
+        """returns a dictionary containing all keys/values of the instance,
+        or only those of the keys listed in fields, leaving created_at and
+        updated_at as datetimes for the JSON encoder if datetimes is True"""
+        if fields is None:
+            new_dict = self.__dict__.copy()
+        else:
+            new_dict = {key: self.__dict__[key] for key in fields
+                        if key in self.__dict__}
+        if "created_at" in new_dict and not datetimes:
             new_dict["created_at"] = new_dict["created_at"].strftime(time)
-        if "updated_at" in new_dict:
+        if "updated_at" in new_dict and not datetimes:
             new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
-        new_dict["__class__"] = self.__class__.__name__
-        if "_sa_instance_state" in new_dict:
-            del new_dict["_sa_instance_state"]
-        if 'password' in new_dict and getenv('HBNB_TYPE_STORAGE') == 'db':
+        if fields is None or "__class__" in fields:
+            new_dict["__class__"] = self.__class__.__name__
+        if "_sa_instance_state" in self.__dict__:
+            new_dict.pop("_sa_instance_state", None)
+            for key in type(self).__mapper__.relationships.keys():
+                new_dict.pop(key, None)
+        if 'password' in new_dict and models.storage_t == 'db':
             del new_dict['password']
         return new_dict
 
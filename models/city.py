@@ -12,8 +12,9 @@ class City(BaseModel, Base):
     """Representation of city """
     if models.storage_t == "db":
         __tablename__ = 'cities'
-        state_id = Column(String(60), ForeignKey('states.id'), nullable=False)
-        name = Column(String(128), nullable=False)
+        state_id = Column(String(60), ForeignKey('states.id'),
+                          nullable=False, index=True)
+        name = Column(String(128), nullable=False, index=True)
         places = relationship("Place", backref="cities")
     else:
         state_id = ""
@@ -22,3 +23,11 @@ class City(BaseModel, Base):
     def __init__(self, *args, **kwargs):
         """initializes city"""
         super().__init__(*args, **kwargs)
+
+    if models.storage_t != "db":
+        @property
+        def places(self):
+            """getter for list of place instances related to the city"""
+            from models.place import Place
+            places = models.storage.all_by(Place, "city_id", self.id)
+            return list(places.values())
@@ -0,0 +1,202 @@
+#!/usr/bin/python3
+"""
+Contains the binary snapshot format of FileStorage
+
+A file starts with a header (magic, version, number of records) and a
+table of (offset, length) pairs, followed by the records. A record is its
+key followed by its typed attributes, __class__ included; datetimes are
+stored as microseconds since the epoch, so they are neither formatted nor
+parsed.
+"""
+
+from datetime import datetime, timedelta
+import json
+import mmap
+from models.base_model import time
+from models.engine.json_stream import iter_items
+import os
+import struct
+import sys
+
+MAGIC = b"HBNB"
+VERSION = 1
+HEADER = struct.Struct("<4sHI")
+ENTRY = struct.Struct("<QI")
+LENGTH = struct.Struct("<I")
+FIELDS = struct.Struct("<H")
+INTEGER = struct.Struct("<q")
+REAL = struct.Struct("<d")
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def encode_str(value):
+    """returns value as length-prefixed UTF-8"""
+    data = value.encode("utf-8")
+    return LENGTH.pack(len(data)) + data
+
+
+def decode_str(buf, pos):
+    """returns the length-prefixed string at pos and the position after it"""
+    length, = LENGTH.unpack_from(buf, pos)
+    pos += LENGTH.size
+    return str(buf[pos:pos + length], "utf-8"), pos + length
+
+
+def encode_value(value):
+    """returns value as a type tag followed by its encoding"""
+    kind = type(value)
+    if value is None:
+        return b"N"
+    if kind is bool:
+        return b"T" if value else b"F"
+    if kind is int and -2 ** 63 <= value < 2 ** 63:
+        return b"i" + INTEGER.pack(value)
+    if kind is float:
+        return b"f" + REAL.pack(value)
+    if kind is str:
+        return b"s" + encode_str(value)
+    if kind is datetime:
+        return b"d" + INTEGER.pack((value - EPOCH) // MICROSECOND)
+    if kind is list:
+        return b"l" + LENGTH.pack(len(value)) + b"".join(
+            encode_value(item) for item in value)
+    return b"j" + encode_str(json.dumps(value))
+
+
+def decode_value(buf, pos):
+    """returns the value encoded at pos and the position after it"""
+    tag = buf[pos:pos + 1]
+    pos += 1
+    if tag == b"s":
+        return decode_str(buf, pos)
+    if tag == b"d":
+        micros, = INTEGER.unpack_from(buf, pos)
+        return EPOCH + micros * MICROSECOND, pos + INTEGER.size
+    if tag == b"i":
+        return INTEGER.unpack_from(buf, pos)[0], pos + INTEGER.size
+    if tag == b"f":
+        return REAL.unpack_from(buf, pos)[0], pos + REAL.size
+    if tag == b"N":
+        return None, pos
+    if tag == b"T":
+        return True, pos
+    if tag == b"F":
+        return False, pos
+    if tag == b"l":
+        count, = LENGTH.unpack_from(buf, pos)
+        pos += LENGTH.size
+        items = []
+        for i in range(count):
+            item, pos = decode_value(buf, pos)
+            items.append(item)
+        return items, pos
+    if tag == b"j":
+        text, pos = decode_str(buf, pos)
+        return json.loads(text), pos
+    raise ValueError("unknown type tag {!r}".format(tag))
+
+
+def encode_record(key, attrs):
+    """returns the record of key holding the attributes in attrs, which
+    must include __class__"""
+    parts = [encode_str(key), FIELDS.pack(len(attrs))]
+    for name, value in attrs.items():
+        parts.append(encode_str(name))
+        parts.append(encode_value(value))
+    return b"".join(parts)
+
+
+def decode_record(buf):
+    """returns the key and the attributes of the record in buf"""
+    key, pos = decode_str(buf, 0)
+    count, = FIELDS.unpack_from(buf, pos)
+    pos += FIELDS.size
+    attrs = {}
+    for i in range(count):
+        name, pos = decode_str(buf, pos)
+        attrs[sys.intern(name)], pos = decode_value(buf, pos)
+    return key, attrs
+
+
+def pack(records):
+    """returns the contents of a file holding the encoded records"""
+    offset = HEADER.size + ENTRY.size * len(records)
+    table = []
+    for record in records:
+        table.append(ENTRY.pack(offset, len(record)))
+        offset += len(record)
+    return b"".join([HEADER.pack(MAGIC, VERSION, len(records))] + table +
+                    records)
+
+
+class LazyRecord:
+    """A record of a memory-mapped file, decoded only when asked to"""
+    __slots__ = ("key", "mapping", "offset", "length")
+
+    def __init__(self, mapping, offset, length):
+        """reads the key of the record at offset in mapping"""
+        self.mapping = mapping
+        self.offset = offset
+        self.length = length
+        self.key = decode_str(mapping, offset)[0]
+
+    @property
+    def data(self):
+        """the encoded record"""
+        return self.mapping[self.offset:self.offset + self.length]
+
+    def decode(self):
+        """returns the attributes of the record"""
+        return decode_record(self.data)[1]
+
+
+def read_records(path):
+    """returns a LazyRecord for each record of the file at path, which is
+    read through a memory map"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, count = HEADER.unpack_from(mapping, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("{} is not a version {} HBNB file".format(
+            path, VERSION))
+    table = mapping[HEADER.size:HEADER.size + ENTRY.size * count]
+    return [LazyRecord(mapping, offset, length)
+            for offset, length in ENTRY.iter_unpack(table)]
+
+
+def json_to_binary(src, dst):
+    """converts the JSON file src of FileStorage to the binary file dst"""
+    records = []
+    with open(src, "r") as f:
+        for key, attrs in iter_items(f):
+            for name in ("created_at", "updated_at"):
+                if type(attrs.get(name)) is str:
+                    attrs[name] = datetime.strptime(attrs[name], time)
+            records.append(encode_record(key, attrs))
+    with open(dst, "wb") as f:
+        f.write(pack(records))
+
+
+def binary_to_json(src, dst):
+    """converts the binary file src of FileStorage to the JSON file dst"""
+    parts = []
+    for record in read_records(src):
+        attrs = record.decode()
+        parts.append(json.dumps(record.key) + ": " + json.dumps(
+            attrs, default=lambda value: value.strftime(time)))
+    with open(dst, "w") as f:
+        f.write("{" + ", ".join(parts) + "}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: {} <file.json|file.bin> <destination>".format(
+            sys.argv[0]))
+        sys.exit(1)
+    if sys.argv[1].endswith(".bin"):
+        binary_to_json(sys.argv[1], sys.argv[2])
+    else:
+        json_to_binary(sys.argv[1], sys.argv[2])
@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+"""
+Contains the MeteredPool class and the fork guard of the database engines
+"""
+
+import os
+import threading
+from time import monotonic
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+
+class MeteredPool(QueuePool):
+    """A QueuePool that counts checkouts, the time spent waiting for a
+    connection, overflow connections and checkout timeouts"""
+
+    def __init__(self, *args, **kwargs):
+        """creates the pool with its counters at zero"""
+        super().__init__(*args, **kwargs)
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+        self.__checkouts = 0
+        self.__overflows = 0
+        self.__timeouts = 0
+        self.__wait_total = 0.0
+        self.__wait_max = 0.0
+
+    def _do_get(self):
+        """checks a connection out, timing the wait"""
+        if getattr(self.__local, "nested", False):
+            return super()._do_get()
+        self.__local.nested = True
+        start = monotonic()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            with self.__lock:
+                self.__timeouts += 1
+            raise
+        finally:
+            self.__local.nested = False
+        waited = monotonic() - start
+        with self.__lock:
+            self.__checkouts += 1
+            self.__wait_total += waited
+            self.__wait_max = max(self.__wait_max, waited)
+        return connection
+
+    def _inc_overflow(self):
+        """reserves room for a new connection, counting it when it goes
+        past the size of the pool"""
+        created = super()._inc_overflow()
+        if created and self.overflow() > 0:
+            with self.__lock:
+                self.__overflows += 1
+        return created
+
+    def metrics(self):
+        """returns the counters of the pool and its current state"""
+        with self.__lock:
+            return {"size": self.size(),
+                    "checked_out": self.checkedout(),
+                    "checked_in": self.checkedin(),
+                    "overflow": max(self.overflow(), 0),
+                    "checkouts": self.__checkouts,
+                    "overflows": self.__overflows,
+                    "timeouts": self.__timeouts,
+                    "wait_total": self.__wait_total,
+                    "wait_max": self.__wait_max}
+
+
+def guard_forks(engine):
+    """makes the pool of engine replace a connection opened by the parent
+    of a forked process instead of sharing it"""
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection, connection_record):
+        """records the process that opened the connection"""
+        connection_record.info["pid"] = os.getpid()
+
+    @event.listens_for(engine, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        """invalidates a connection opened by another process"""
+        pid = os.getpid()
+        if connection_record.info["pid"] != pid:
+            connection_record.dbapi_connection = None
+            connection_proxy.dbapi_connection = None
+            raise exc.DisconnectionError(
+                "connection opened by process {}, checked out by {}".format(
+                    connection_record.info["pid"], pid))
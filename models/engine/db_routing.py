@@ -0,0 +1,33 @@
+#!/usr/bin/python3
+"""
+Contains the RoutingSession class
+"""
+
+import random
+from sqlalchemy.orm import Session
+
+
+class RoutingSession(Session):
+    """A Session that reads from one of the replica engines until it
+    writes, then sends every statement to the primary engine it is bound
+    to, so that it reads its own writes until it is closed"""
+
+    def __init__(self, replicas=(), **kwargs):
+        """creates the session, reading from the engines of replicas"""
+        super().__init__(**kwargs)
+        self.__replicas = list(replicas)
+
+    def use_primary(self):
+        """sends every later statement of the session to the primary"""
+        self.info["primary"] = True
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        """returns the primary engine to write or once the session wrote,
+        and the replica the session picked otherwise"""
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.use_primary()
+        if not self.__replicas or self.info.get("primary"):
+            return super().get_bind(mapper, clause, **kwargs)
+        if "replica" not in self.info:
+            self.info["replica"] = random.choice(self.__replicas)
+        return self.info["replica"]
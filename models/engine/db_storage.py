@@ -7,14 +7,20 @@ import models
 from models.amenity import Amenity
 from models.base_model import BaseModel, Base
 from models.city import City
+from models.engine.db_pool import MeteredPool, guard_forks
+from models.engine.db_routing import RoutingSession
+from models.engine.pagination import cursor, position
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
 from os import getenv
 import sqlalchemy
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import and_, create_engine, event, func, literal, or_
+from sqlalchemy import select, text, union_all
+from sqlalchemy.orm import load_only, scoped_session, selectinload
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm.util import identity_key
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
@@ -27,30 +33,157 @@ class DBStorage:
 
     def __init__(self):
         """Instantiate a DBStorage object"""
+        HBNB_ENV = getenv('HBNB_ENV')
+        self.__engine = self._create_engine()
+        guard_forks(self.__engine)
+        self.__replicas = []
+        for url in getenv('HBNB_MYSQL_REPLICAS', '').split(','):
+            if url.strip():
+                self.__replicas.append(self._create_engine(url.strip()))
+                guard_forks(self.__replicas[-1])
+        if HBNB_ENV == "test":
+            Base.metadata.drop_all(self.__engine)
+
+    def _create_engine(self, url=None):
+        """returns the engine of the MySQL database, or of the replica at
+        url"""
         HBNB_MYSQL_USER = getenv('HBNB_MYSQL_USER')
         HBNB_MYSQL_PWD = getenv('HBNB_MYSQL_PWD')
         HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
         HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
-        HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
-        if HBNB_ENV == "test":
-            Base.metadata.drop_all(self.__engine)
+        if url is None:
+            url = 'mysql+mysqldb://{}:{}@{}/{}'.format(HBNB_MYSQL_USER,
+                                                       HBNB_MYSQL_PWD,
+                                                       HBNB_MYSQL_HOST,
+                                                       HBNB_MYSQL_DB)
+        engine = create_engine(url, **self._pool_options())
+        timeout = self._statement_timeout()
+        if timeout:
+            @event.listens_for(engine, "connect")
+            def limit_statements(dbapi_connection, connection_record):
+                """sets the statement timeout of a new connection"""
+                cursor = dbapi_connection.cursor()
+                cursor.execute("SET SESSION max_execution_time = {:d}".
+                               format(timeout))
+                cursor.close()
+        return engine
+
+    def _pool_options(self):
+        """returns the connection pool settings of create_engine from the
+        HBNB_MYSQL_POOL_SIZE, HBNB_MYSQL_MAX_OVERFLOW,
+        HBNB_MYSQL_POOL_RECYCLE, HBNB_MYSQL_POOL_TIMEOUT and
+        HBNB_MYSQL_PRE_PING variables"""
+        return {"poolclass": MeteredPool,
+                "pool_size": int(getenv('HBNB_MYSQL_POOL_SIZE', '5')),
+                "max_overflow": int(getenv('HBNB_MYSQL_MAX_OVERFLOW', '10')),
+                "pool_recycle": int(getenv('HBNB_MYSQL_POOL_RECYCLE', '3600')),
+                "pool_timeout": float(getenv('HBNB_MYSQL_POOL_TIMEOUT', '30')),
+                "pool_pre_ping": getenv('HBNB_MYSQL_PRE_PING', '1') == '1'}
+
+    def _statement_timeout(self):
+        """returns the milliseconds a statement may run for, from
+        HBNB_MYSQL_STATEMENT_TIMEOUT, 0 for no limit"""
+        return int(getenv('HBNB_MYSQL_STATEMENT_TIMEOUT', '0'))
+
+    def pool_metrics(self):
+        """returns the counters and the state of the connection pool"""
+        return self.__engine.pool.metrics()
+
+    def _create_schema(self, engine):
+        """creates the tables of the models that do not exist yet, and the
+        indexes missing from the tables that do"""
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(connection, checkfirst=True)
+
+    def __options(self, cls, load, fields=None):
+        """returns the loader options that load each relationship path of
+        load, like "cities.places", with the objects of cls, in one SELECT
+        per relationship instead of one per object, and only the columns
+        of cls listed in fields if given"""
+        options = []
+        if fields is not None:
+            columns = cls.__table__.columns.keys()
+            options.append(load_only(*[getattr(cls, field)
+                                       for field in fields
+                                       if field in columns] or [cls.id]))
+        for path in load:
+            model, option = cls, None
+            for name in path.split("."):
+                attr = getattr(model, name)
+                if option is None:
+                    option = selectinload(attr)
+                else:
+                    option = option.selectinload(attr)
+                model = attr.property.mapper.class_
+            options.append(option)
+        return options
 
-    def all(self, cls=None):
-        """query on the current database session"""
+    def all(self, cls=None, load=()):
+        """query on the current database session, eager loading the
+        relationship paths of load along with the objects of cls"""
         new_dict = {}
         for clss in classes:
             if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
+                model = classes[clss]
+                options = self.__options(model, load) if cls else ()
+                objs = self.__session.query(model).options(*options).all()
                 for obj in objs:
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
         return (new_dict)
 
+    def iter_all(self, cls=None, batch=1000, load=(), fields=None):
+        """yields the objects of class cls, or of every class, querying
+        them batch rows at a time in primary key order, and the
+        relationship paths of load once per batch; only the columns listed
+        in fields are loaded if given"""
+        for clss in classes:
+            if cls is None or cls is classes[clss] or cls is clss:
+                model = classes[clss]
+                options = self.__options(model, load, fields) if cls else ()
+                last = None
+                while True:
+                    query = self.__session.query(model).options(*options)
+                    query = query.order_by(model.id)
+                    if last is not None:
+                        query = query.filter(model.id > last)
+                    objs = query.limit(batch).all()
+                    for obj in objs:
+                        yield obj
+                    if len(objs) < batch:
+                        break
+                    last = objs[-1].id
+
+    def page(self, cls, limit, after=None, order="created_at", attr=None,
+             value=None, fields=None):
+        """returns the first limit objects of class cls, whose attribute
+        attr equals value if given, in (order, id) order after the cursor
+        after, and the cursor of the next page or None; the query seeks
+        the index on order instead of skipping the previous pages, and
+        loads only the columns listed in fields if given"""
+        column = getattr(cls, order)
+        query = self.__session.query(cls)
+        if fields is not None:
+            query = query.options(*self.__options(cls, (), fields + [order]))
+        if attr is not None:
+            query = query.filter(getattr(cls, attr) == value)
+        if after is not None:
+            key, id = position(after, order)
+            if key is None:
+                query = query.filter(or_(column.isnot(None),
+                                         and_(column.is_(None),
+                                              cls.id > id)))
+            else:
+                query = query.filter(or_(column > key,
+                                         and_(column == key, cls.id > id)))
+        objs = query.order_by(column, cls.id).limit(limit + 1).all()
+        if len(objs) > limit:
+            return objs[:limit], cursor(objs[limit - 1], order)
+        return objs, None
+
     def new(self, obj):
         """add the object to the current database session"""
         self.__session.add(obj)
@@ -59,6 +192,34 @@ class DBStorage:
         """commit all changes of the current database session"""
         self.__session.commit()
 
+    def bulk_new(self, objs):
+        """adds the objects of objs to those bulk_save() inserts, without
+        tracking them in the session"""
+        self.__session.info.setdefault("bulk", []).extend(objs)
+
+    def bulk_save(self, batch=10000):
+        """inserts the objects added by bulk_new, table by table in foreign
+        key order and batch rows per executemany, then commits all changes
+        of the session; only the columns set on the objects are inserted,
+        the others taking their defaults as with save(), and not their
+        relationships"""
+        by_table = {}
+        for obj in self.__session.info.pop("bulk", []):
+            by_table.setdefault(obj.__table__, []).append(obj)
+        self.__session.flush()
+        for table in Base.metadata.sorted_tables:
+            objs = by_table.get(table, [])
+            for i in range(0, len(objs), batch):
+                groups = {}
+                for obj in objs[i:i + batch]:
+                    row = {column.key: obj.__dict__[column.key]
+                           for column in table.columns
+                           if column.key in obj.__dict__}
+                    groups.setdefault(tuple(row), []).append(row)
+                for rows in groups.values():
+                    self.__session.execute(table.insert(), rows)
+        self.__session.commit()
+
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
         if obj is not None:
@@ -66,8 +227,10 @@ class DBStorage:
 
     def reload(self):
         """reloads data from the database"""
-        Base.metadata.create_all(self.__engine)
-        sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+        self._create_schema(self.__engine)
+        sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False,
+                                    class_=RoutingSession,
+                                    replicas=self.__replicas)
         Session = scoped_session(sess_factory)
         self.__session = Session
 
@@ -75,18 +238,76 @@ class DBStorage:
         """call remove() method on the private session attribute"""
         self.__session.remove()
 
-    def get(self, cls, id):
-        """Retrieves a single object from the database by class and ID."""
+    def use_primary(self):
+        """makes the current session read from the primary database
+        instead of a replica until it is closed"""
+        self.__session().use_primary()
+
+    def get(self, cls, id, load=(), fields=None):
+        """Retrieves a single object from the database by class and ID,
+        without a query when the session already holds it, loading only
+        the columns listed in fields if given"""
         if cls and id:
-            return self.__session.query(cls).filter_by(id=id).first()
+            options = self.__options(cls, load, fields)
+            if options:
+                return self.__session.get(cls, id, options=options)
+            return self.__session.get(cls, id)
         return None
 
+    def get_many(self, cls, ids, load=()):
+        """Retrieves the objects of class cls with the given ids, in the
+        order of ids and skipping the missing ones, with a single IN query
+        for those the session does not hold yet, or for all of them with
+        the relationship paths of load"""
+        if not cls:
+            return []
+        ids = [id for id in ids if id]
+        found = {}
+        for id in ids if not load else ():
+            obj = self.__session.identity_map.get(identity_key(cls, id))
+            if obj is not None:
+                found[id] = obj
+        missing = set(ids) - set(found)
+        if missing:
+            query = self.__session.query(cls).filter(cls.id.in_(missing))
+            for obj in query.options(*self.__options(cls, load)):
+                found[obj.id] = obj
+        return [found[id] for id in ids if id in found]
+
     def count(self, cls=None):
         """Returns the number of objs matching the given class or all objs"""
         if cls:
             return self.__session.query(cls).count()
         else:
-            num_of_objs = 0
-            for model in classes.values():
-                num_of_objs += self.__session.query(model).count()
-            return num_of_objs
+            return sum(self.count_many().values())
+
+    def count_many(self, clss=None, approximate=False):
+        """Returns the number of objs of each class of clss, or of every
+        class, by class name, counted in a single UNION ALL query, or read
+        from the table statistics when approximate is set"""
+        names = [name for name in classes
+                 if clss is None or name in clss or classes[name] in clss]
+        if not names:
+            return {}
+        if approximate:
+            counts = self._approximate_counts(
+                {classes[name].__tablename__: name for name in names})
+            if counts is not None:
+                return counts
+        self.__session.flush()
+        query = union_all(*[
+            select(literal(name), func.count()).
+            select_from(classes[name].__table__) for name in names])
+        return dict(self.__session.execute(query).all())
+
+    def _approximate_counts(self, tables):
+        """returns the row counts of the tables, by class name, estimated
+        by MySQL from the table statistics it keeps"""
+        rows = self.__session.execute(text(
+            "SELECT table_name, table_rows FROM information_schema.tables "
+            "WHERE table_schema = DATABASE()"))
+        counts = dict.fromkeys(tables.values(), 0)
+        for table, count in rows:
+            if table in tables:
+                counts[tables[table]] = int(count or 0)
+        return counts
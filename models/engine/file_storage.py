@@ -3,10 +3,32 @@
 Contains the FileStorage class
 """
 
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 import json
+import mmap
+import multiprocessing
+import os
+from os import getenv
+import shutil
+import struct
+import threading
+from time import monotonic
+from types import MappingProxyType
+import weakref
+import zlib
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 from models.amenity import Amenity
-from models.base_model import BaseModel
+from models.base_model import BaseModel, time
 from models.city import City
+from models.engine import binary_format
+from models.engine.json_stream import iter_items
+from models.engine.pagination import paginate
+from models.engine.snapshot import Bucket
 from models.place import Place
 from models.review import Review
 from models.state import State
@@ -14,6 +36,19 @@ from models.user import User
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# the generation counter at the start of the lock file
+GENERATION = struct.Struct("<Q")
+
+
+def load_shard(path, build=True):
+    """returns the (key, record, JSON text) triples of the JSON file at
+    path, with each record built into a model instance if build is True,
+    and its text kept otherwise"""
+    with open(path, 'r') as f:
+        if not build:
+            return list(iter_items(f, text=True))
+        return [(key, classes[value["__class__"]](**value), None)
+                for key, value in iter_items(f)]
 
 
 class FileStorage:
@@ -21,70 +56,918 @@ class FileStorage:
 
     # string - path to the JSON file
     __file_path = "file.json"
+    # bool - append changes to <__file_path>.log instead of rewriting
+    # __file_path on every save
+    __journal = getenv("HBNB_FILE_JOURNAL") == "1"
+    # int - journal entries after which the journal is compacted
+    __compact_every = int(getenv("HBNB_FILE_COMPACT_EVERY", "1000"))
+    # int - journal entries written since the last compaction
+    __journaled = 0
+    # tuple - signature of the files as last loaded or saved
+    __seen = None
+    # bool - keep reloaded records as parsed dicts until they are used
+    __lazy = getenv("HBNB_FILE_LAZY") == "1"
+    # dictionary - parsed dicts not built yet, by <class name> then key,
+    # in buckets
+    __raw = {}
+    # string - format of the snapshot, "json" for __file_path or "binary"
+    # for <__file_path without extension>.bin
+    __format = getenv("HBNB_FILE_FORMAT", "json")
+    # int - hash shards per class in <__file_path>.d/, 0 for __file_path
+    __shards = int(getenv("HBNB_FILE_SHARDS", "0"))
+    # int - processes forked by reload() to parse the shards, 0 to parse
+    # them in this process
+    __reload_workers = int(getenv("HBNB_FILE_RELOAD_WORKERS", "0"))
+    # bool - lock <__file_path>.lock around saves and reloads so that
+    # several processes can share the files
+    __locking = getenv("HBNB_FILE_LOCK") == "1" and fcntl is not None
+    # tuple - (path, pid, file descriptor, memory map) of the lock file
+    __lock_file = None
+    # int - lock holds nested in the current one
+    __lock_depth = 0
+    # int - generation of the files as last loaded or saved; every save
+    # increments the generation counter held in the lock file
+    __generation = 0
+    # int - milliseconds a save may stay in memory before the background
+    # thread writes it, 0 to write on every save
+    __flush_ms = int(getenv("HBNB_FILE_FLUSH_MS", "0"))
+    # int - unsaved changes after which the background thread writes at
+    # once
+    __flush_every = int(getenv("HBNB_FILE_FLUSH_EVERY", "100"))
+    # float - monotonic time by which the saved changes must be written,
+    # None when every save was written
+    __due = None
+    # the background thread writing the saved changes, once started
+    __flusher = None
+    # serializes the writes of the files
+    __mutex = threading.RLock()
+    # held by the changes to the objects, one at a time
+    __changing = threading.RLock()
+    # tuple - the latest snapshot, (__by_class, __children, __raw,
+    # __objects) as of the end of the last change; a change edits copies
+    # of the buckets it touches, never the published ones
+    __published = None
+    # dictionary - the copies edited by the current change, by id
+    __editing = {}
+    # int - changes nested in the current one
+    __write_depth = 0
+    # the snapshot pinned by each thread, as (storage, snapshot)
+    __pins = threading.local()
+    # the bucket of a class without objects
+    __empty = Bucket()
+    # guards __due and wakes the background thread up when a save is due;
+    # separate from __mutex so that a save never waits for a write
+    __wakeup = threading.Condition()
+    # set - keys journaled since the last compaction
+    __stale = set()
     # dictionary - empty but will store all bjects by <class name>.id
     __objects = {}
+    # the storage holding each object, by object, for changed(); shared
+    # by every storage
+    __holders = weakref.WeakKeyDictionary()
+    # dictionary - the same objects in a bucket per <class name>
+    __by_class = {}
+    # dictionary - reverse indexes by (<class name>, <foreign key>), each
+    # a bucket mapping a parent id to the {<class name>.id: obj} of its
+    # children
+    __children = {}
+    # the __objects dictionary that the indexes were built from
+    __indexed = None
+    # set - keys of the objects added or changed since the last save
+    __dirty = set()
+    # set - keys of the objects deleted since the last save
+    __deleted = set()
+    # dictionary - (obj, JSON text of obj) by key, as of the last save
+    __fragments = {}
+    # foreign keys with a reverse index, by <class name>
+    __foreign_keys = {"City": ("state_id",),
+                      "Place": ("city_id", "user_id"),
+                      "Review": ("place_id", "user_id")}
+    # the options a storage of its own can be given in place of the
+    # HBNB_FILE_* environment variables
+    __options = ("journal", "compact_every", "lazy", "format", "shards",
+                 "reload_workers", "locking", "flush_ms", "flush_every")
+
+    def __init__(self, file_path=None, **options):
+        """creates a storage sharing the objects and options of the class,
+        or, given file_path, a storage of its own at file_path, with the
+        options overriding the environment"""
+        if file_path is None:
+            if options:
+                raise TypeError("options need a file_path")
+            return
+        for option, value in options.items():
+            if option not in self.__options:
+                raise TypeError("unknown option {!r}".format(option))
+            setattr(self, "_FileStorage__" + option, value)
+        self.__file_path = file_path
+        self.__locking = self.__locking and fcntl is not None
+        self.__journaled = 0
+        self.__seen = None
+        self.__raw = {}
+        self.__lock_file = None
+        self.__lock_depth = 0
+        self.__generation = 0
+        self.__due = None
+        self.__flusher = None
+        self.__mutex = threading.RLock()
+        self.__changing = threading.RLock()
+        self.__published = None
+        self.__editing = {}
+        self.__write_depth = 0
+        self.__wakeup = threading.Condition()
+        self.__stale = set()
+        self.__objects = {}
+        self.__by_class = {}
+        self.__children = {}
+        self.__indexed = None
+        self.__dirty = set()
+        self.__deleted = set()
+        self.__fragments = {}
+
+    def __owner(self):
+        """returns the holder of __objects, this storage or the class, on
+        which the indexes built from it are kept"""
+        if "_FileStorage__objects" in vars(self):
+            return self
+        return FileStorage
+
+    @contextmanager
+    def __writing(self):
+        """holds the lock of the changes for the block, then publishes the
+        objects and indexes as changed by it as the latest snapshot"""
+        with self.__changing:
+            owner = self.__owner()
+            depth = self.__write_depth
+            if not depth:
+                owner.__editing = {}
+            owner.__write_depth = depth + 1
+            try:
+                yield
+            finally:
+                owner.__write_depth = depth
+                if not depth:
+                    self.__publish()
+
+    def __publish(self):
+        """freezes what the current change edited and makes it the latest
+        snapshot"""
+        for value in self.__editing.values():
+            if isinstance(value, Bucket):
+                value.freeze()
+        owner = self.__owner()
+        owner.__editing = {}
+        owner.__published = (self.__by_class, self.__children, self.__raw,
+                             self.__objects)
+
+    def __latest(self):
+        """returns the latest (buckets, reverse indexes, parsed dicts,
+        __objects) snapshot"""
+        view = self.__published
+        if view is None or view[3] is not self.__objects:
+            with self.__writing():
+                self.__tops()
+            view = self.__published
+        return view
+
+    def __pinned(self):
+        """returns the snapshot pinned by this thread, if any"""
+        pin = getattr(self.__pins, "view", None)
+        if pin is not None and pin[0] is self:
+            return pin[1]
+        return None
+
+    def __view(self):
+        """returns the snapshot pinned by this thread, or else the latest
+        one"""
+        return self.__pinned() or self.__latest()
+
+    def pin(self):
+        """makes the lookups of this thread read the latest snapshot, and
+        only it, until unpin() or close()"""
+        self.unpin()
+        self.__pins.view = (self, self.__latest())
+
+    def unpin(self):
+        """makes the lookups of this thread read the latest snapshot"""
+        self.__pins.view = None
+
+    def __tops(self):
+        """returns the buckets, reverse indexes and parsed dicts for the
+        current change to edit, rebuilt if __objects was replaced"""
+        owner = self.__owner()
+        if self.__indexed is not self.__objects:
+            owner.__indexed = self.__objects
+            owner.__by_class = {}
+            owner.__children = {}
+            for name in ("_FileStorage__by_class", "_FileStorage__children"):
+                self.__editing[id(getattr(self, name))] = getattr(self, name)
+            for key, obj in self.__objects.items():
+                self.__index(key, obj)
+        for name in ("_FileStorage__by_class", "_FileStorage__children",
+                     "_FileStorage__raw"):
+            value = getattr(self, name)
+            if id(value) not in self.__editing:
+                value = dict(value)
+                setattr(owner, name, value)
+                self.__editing[id(value)] = value
+        return self.__by_class, self.__children, self.__raw
+
+    def __edit(self, container, key, factory=Bucket):
+        """returns container[key] for the current change to edit, replacing
+        it first with an editable copy unless the change already did"""
+        value = container.get(key)
+        if value is None or id(value) not in self.__editing:
+            if value is None:
+                value = factory()
+            if isinstance(value, Bucket):
+                value = value.edit()
+            else:
+                value = dict(value)
+            container[key] = value
+            self.__editing[id(value)] = value
+        return value
+
+    def __index(self, key, obj):
+        """adds obj to the per-class bucket and the reverse indexes"""
+        by_class, children, raw = self.__tops()
+        name = obj.__class__.__name__
+        self.__edit(by_class, name)[key] = obj
+        for fk in self.__foreign_keys.get(name, ()):
+            index = self.__edit(children, (name, fk))
+            self.__edit(index, getattr(obj, fk, None), dict)[key] = obj
+
+    def __unindex(self, key, obj):
+        """removes obj from the per-class bucket and the reverse indexes"""
+        by_class, children, raw = self.__tops()
+        name = obj.__class__.__name__
+        if key in by_class.get(name, ()):
+            self.__edit(by_class, name).pop(key)
+        for fk in self.__foreign_keys.get(name, ()):
+            self.__unlink(name, fk, getattr(obj, fk, None), key)
+
+    def __unlink(self, name, fk, parent, key):
+        """removes key from the children of parent in the reverse index of
+        the foreign key fk of class name"""
+        index = self.__children.get((name, fk))
+        if index is not None and key in index.get(parent, ()):
+            index = self.__edit(self.__children, (name, fk))
+            siblings = self.__edit(index, parent, dict)
+            del siblings[key]
+            if not siblings:
+                index.pop(parent)
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
-        if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
-        return self.__objects
+    def __hydrate(self, name, keys=None):
+        """builds the objects of class name, or only those with the given
+        keys, that are still held as parsed dicts"""
+        raw = self.__raw.get(name)
+        if not raw:
+            return
+        if keys is None:
+            keys = list(raw)
+        for key in keys:
+            value = raw.get(key)
+            if value is not None:
+                if isinstance(value, binary_format.LazyRecord):
+                    value = value.decode()
+                self.__load(key, classes[value["__class__"]](**value))
+
+    def __built(self, name=None, key=None):
+        """builds the parsed dicts of class name, of all classes if name is
+        None, or only the one of key"""
+        raw = self.__latest()[2]
+        if name is None:
+            if any(raw.values()):
+                with self.__writing():
+                    for name in list(self.__raw):
+                        self.__hydrate(name)
+        elif key is None:
+            if raw.get(name):
+                with self.__writing():
+                    self.__hydrate(name)
+        elif key in raw.get(name, ()):
+            with self.__writing():
+                self.__hydrate(name, (key,))
+
+    def __class_view(self, name):
+        """returns the bucket of class name in the snapshot read by this
+        thread, with the parsed dicts of the class built"""
+        by_class, children, raw, objects = self.__view()
+        bucket = by_class.get(name, self.__empty)
+        pending = raw.get(name)
+        if not pending:
+            return bucket
+        self.__built(name)
+        if self.__pinned() is None:
+            return self.__latest()[0].get(name, self.__empty)
+        bucket = bucket.edit()
+        for key in pending:
+            obj = self.__objects.get(key)
+            if obj is not None:
+                bucket[key] = obj
+        bucket.freeze()
+        return bucket
+
+    def all(self, cls=None, load=()):
+        """returns __objects, or a read-only snapshot of the objects of cls"""
+        if cls is None:
+            self.__built()
+            return self.__objects
+        name = cls if isinstance(cls, str) else cls.__name__
+        return self.__class_view(name)
+
+    def iter_all(self, cls=None, load=(), fields=None):
+        """yields the objects of class cls, or of every class, from the
+        snapshot read by this thread"""
+        if cls is None:
+            names = list(classes)
+        else:
+            names = [cls if isinstance(cls, str) else cls.__name__]
+        for name in names:
+            yield from self.all(name).values()
+
+    def page(self, cls, limit, after=None, order="created_at", attr=None,
+             value=None, fields=None):
+        """returns the first limit objects of class cls, whose attribute
+        attr equals value if given, in (order, id) order after the cursor
+        after, and the cursor of the next page or None"""
+        if attr is None:
+            objs = self.all(cls).values()
+        else:
+            objs = self.all_by(cls, attr, value).values()
+        return paginate(objs, limit, after, order)
+
+    def all_by(self, cls, attr, value):
+        """returns a read-only snapshot of the objects of class cls whose
+        attribute attr equals value"""
+        name = cls if isinstance(cls, str) else cls.__name__
+        bucket = self.__class_view(name)
+        by_class, children = self.__view()[:2]
+        if attr in self.__foreign_keys.get(name, ()) and \
+                bucket is by_class.get(name, self.__empty):
+            index = children.get((name, attr), self.__empty)
+            return MappingProxyType(index.get(value, {}))
+        new_dict = {}
+        for key, obj in bucket.items():
+            if getattr(obj, attr, None) == value:
+                new_dict[key] = obj
+        return MappingProxyType(new_dict)
 
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            with self.__writing():
+                self.__load(key, obj)
+                self.__dirty.add(key)
+
+    def bulk_new(self, objs):
+        """sets the objects of objs in __objects, publishing a single
+        snapshot for all of them"""
+        with self.__writing():
+            for obj in objs:
+                if obj is not None:
+                    key = obj.__class__.__name__ + "." + obj.id
+                    self.__load(key, obj)
+                    self.__dirty.add(key)
+
+    def bulk_save(self):
+        """writes the objects set by bulk_new, with every other change, in
+        a single save"""
+        self.save()
+
+    def __load(self, key, obj):
+        """sets obj in __objects and the indexes without marking it dirty"""
+        by_class, children, raw = self.__tops()
+        if key in self.__objects:
+            self.__unindex(key, self.__objects[key])
+        self.__objects[key] = obj
+        self.__holders[obj] = self
+        self.__index(key, obj)
+        name = obj.__class__.__name__
+        if key in raw.get(name, ()):
+            self.__edit(raw, name).pop(key)
+        self.__dirty.discard(key)
+        self.__deleted.discard(key)
+
+    def __unload(self, key):
+        """removes the object with key from __objects and the indexes"""
+        by_class, children, raw = self.__tops()
+        if key in self.__objects:
+            obj = self.__objects.pop(key)
+            self.__unindex(key, obj)
+            if self.__holders.get(obj) is self:
+                del self.__holders[obj]
+        name = key.split(".")[0]
+        if key in raw.get(name, ()):
+            self.__edit(raw, name).pop(key)
+        self.__fragments.pop(key, None)
+
+    def __stash(self, key, value, text=None):
+        """keeps the parsed dict or binary record value of key until its
+        object is used, and the JSON text value was read from if given"""
+        self.__unload(key)
+        self.__dirty.discard(key)
+        self.__deleted.discard(key)
+        self.__edit(self.__raw, key.split(".")[0])[key] = value
+        if text is not None:
+            self.__fragments[key] = (value, False, text)
+
+    def __restore(self, key, value):
+        """loads the parsed dict value of key, built now or on first use"""
+        if self.__lazy:
+            self.__stash(key, value)
+        else:
+            self.__load(key, classes[value["__class__"]](**value))
+
+    def changed(self, obj, attr, old):
+        """tells the storage holding obj, whichever it is, that its
+        attribute attr was changed from old"""
+        storage = self.__holders.get(obj)
+        if storage is not None:
+            storage.__change(obj, attr, old)
+
+    def __change(self, obj, attr, old):
+        """marks obj dirty after its attribute attr was changed from old,
+        and moves it in the reverse indexes if attr is a foreign key whose
+        value changed"""
+        name = obj.__class__.__name__
+        key = name + "." + str(getattr(obj, "id", None))
+        if self.__objects.get(key) is not obj:
+            return
+        value = getattr(obj, attr, None)
+        if attr not in self.__foreign_keys.get(name, ()) or value == old:
+            with self.__changing:
+                self.__dirty.add(key)
+            return
+        with self.__writing():
+            self.__dirty.add(key)
+            self.__unlink(name, attr, old, key)
+            index = self.__edit(self.__tops()[1], (name, attr))
+            self.__edit(index, value, dict)[key] = obj
 
     def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        """serializes __objects to the JSON file (path: __file_path), or
+        leaves it to the background thread when writes are deferred"""
+        if self.__flush_ms <= 0:
+            self.flush()
+            return
+        with self.__wakeup:
+            if self.__due is None:
+                self.__due = monotonic() + self.__flush_ms / 1000
+            if len(self.__dirty) + len(self.__deleted) >= self.__flush_every:
+                self.__due = 0
+            if self.__flusher is None or not self.__flusher.is_alive():
+                self.__flusher = threading.Thread(
+                    target=self.__flush_loop, name="FileStorage flush",
+                    daemon=True)
+                self.__flusher.start()
+                atexit.register(self.__flush_pending)
+            self.__wakeup.notify_all()
+
+    def flush(self):
+        """writes the changes saved since the last write to the JSON file,
+        or appends them to the journal"""
+        self.__flush(compact=not self.__journal)
+
+    def __flush(self, compact):
+        """writes the latest snapshot, or appends the changes to the
+        journal, while the objects may go on changing"""
+        with self.__mutex, self.__lock(exclusive=True):
+            with self.__wakeup:
+                self.__due = None
+            with self.__changing:
+                view = self.__latest()
+                dirty = set(self.__dirty)
+                deleted = set(self.__deleted)
+                self.__dirty.clear()
+                self.__deleted.clear()
+            try:
+                if compact:
+                    self.__compact(view, dirty, deleted)
+                else:
+                    self.__append(view, dirty, deleted)
+            except BaseException:
+                with self.__writing():
+                    self.__dirty.update(key for key in dirty
+                                        if key in self.__objects)
+                    self.__deleted.update(key for key in deleted
+                                          if key not in self.__objects)
+                raise
+
+    def __flush_pending(self):
+        """writes the saved changes, if some are not written yet"""
+        with self.__mutex:
+            if self.__due is not None:
+                self.flush()
+
+    def __flush_loop(self):
+        """writes the saved changes once they are due, in the background"""
+        while True:
+            with self.__wakeup:
+                while self.__due is None or self.__due > monotonic():
+                    if self.__due is None:
+                        self.__wakeup.wait()
+                    else:
+                        self.__wakeup.wait(self.__due - monotonic())
+            try:
+                self.__flush_pending()
+            except Exception:
+                with self.__wakeup:
+                    self.__due = monotonic() + self.__flush_ms / 1000
+
+    def __append(self, view, dirty, deleted):
+        """appends the keys deleted and the objects of view changed since
+        the last save to the journal"""
+        lines = []
+        for key in deleted:
+            lines.append(json.dumps([key, None]))
+        for key in dirty:
+            obj = view[0].get(key.split(".")[0], self.__empty).get(key)
+            if obj is not None:
+                fragment = self.__fragment(key, obj, dirty)
+                lines.append("[" + json.dumps(key) + ", " + fragment + "]")
+        self.__stale.update(dirty, deleted)
+        if not lines:
+            return
+        with open(self.__file_path + ".log", 'a') as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.__written()
+        self.__journaled += len(lines)
+        if self.__journaled >= self.__compact_every:
+            self.__compact(view, set(), set())
+
+    def __fragment(self, key, obj, dirty, binary=False):
+        """returns the JSON text, or the binary record, of obj, serializing
+        it again only if it was replaced or is in dirty"""
+        cached = self.__fragments.get(key)
+        if cached is None or cached[0] is not obj or \
+                cached[1] is not binary or key in dirty:
+            if binary:
+                attrs = obj.__dict__.copy()
+                attrs.pop("_sa_instance_state", None)
+                attrs["__class__"] = obj.__class__.__name__
+                fragment = binary_format.encode_record(key, attrs)
+            else:
+                fragment = json.dumps(obj.to_dict())
+            cached = (obj, binary, fragment)
+            self.__fragments[key] = cached
+        return cached[2]
+
+    def __part(self, key, value, binary):
+        """returns the JSON text, or the binary record, of an unbuilt record
+        of key, encoding it only if it was not read or written as is"""
+        if binary and isinstance(value, binary_format.LazyRecord):
+            return value.data
+        cached = self.__fragments.get(key)
+        if cached is None or cached[0] is not value or \
+                cached[1] is not binary:
+            if binary:
+                fragment = binary_format.encode_record(key, value)
+            else:
+                attrs = value
+                if isinstance(value, binary_format.LazyRecord):
+                    attrs = value.decode()
+                fragment = json.dumps(
+                    attrs, default=lambda value: value.strftime(time))
+            cached = (value, binary, fragment)
+            self.__fragments[key] = cached
+        if binary:
+            return cached[2]
+        return json.dumps(key) + ": " + cached[2]
+
+    def __binary_path(self):
+        """returns the path of the binary snapshot"""
+        return os.path.splitext(self.__file_path)[0] + ".bin"
+
+    def __shard(self, key):
+        """returns the name of the shard file holding key"""
+        name, _, id = key.partition(".")
+        return "{}.{}-of-{}.json".format(
+            name, zlib.crc32(id.encode()) % self.__shards, self.__shards)
+
+    def __group(self, view, names, dirty, binary=False):
+        """returns the JSON text, or the binary records, of the objects of
+        view of the classes names, grouped by shard file name (None when
+        not sharded)"""
+        groups = {}
+        by_class, children, raw = view[:3]
+        for name in names:
+            for key, obj in by_class.get(name, self.__empty).items():
+                shard = self.__shard(key) if self.__shards else None
+                fragment = self.__fragment(key, obj, dirty, binary)
+                if not binary:
+                    fragment = json.dumps(key) + ": " + fragment
+                groups.setdefault(shard, []).append(fragment)
+            for key, value in raw.get(name, self.__empty).items():
+                shard = self.__shard(key) if self.__shards else None
+                groups.setdefault(shard, []).append(
+                    self.__part(key, value, binary))
+        return groups
+
+    def __write(self, path, parts, binary=False):
+        """atomically replaces path with the JSON object, or the binary
+        file, made of parts"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb' if binary else 'w') as f:
+            if binary:
+                f.write(binary_format.pack(parts))
+            else:
+                f.write("{" + ", ".join(parts) + "}")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def __write_shards(self, view, dirty, deleted):
+        """rewrites the shard files holding changed objects of view, or all
+        of them if the directory was written with another number of
+        shards"""
+        directory = self.__file_path + ".d"
+        os.makedirs(directory, exist_ok=True)
+        suffix = "-of-{}.json".format(self.__shards)
+        present = set(name for name in os.listdir(directory)
+                      if name.endswith(".json"))
+        full = not present or any(not name.endswith(suffix)
+                                  for name in present)
+        if full:
+            names = set(view[0]) | set(view[2])
+            groups = self.__group(view, names, dirty)
+            targets = set(groups)
+        else:
+            changed = self.__stale | dirty | deleted
+            targets = set(self.__shard(key) for key in changed)
+            groups = self.__group(view, set(shard.split(".")[0]
+                                            for shard in targets), dirty)
+        for shard in targets:
+            self.__write(os.path.join(directory, shard), groups.get(shard, []))
+        if full:
+            for name in present - targets:
+                os.remove(os.path.join(directory, name))
+            for path in (self.__file_path, self.__binary_path()):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def compact(self):
+        """writes all of __objects to __file_path, or the shard files that
+        changed, and empties the journal"""
+        self.__flush(compact=True)
+
+    def __compact(self, view, dirty, deleted):
+        """writes view to the snapshot files and empties the journal, with
+        the lock file held"""
+        if self.__shards:
+            self.__write_shards(view, dirty, deleted)
+        else:
+            binary = self.__format == "binary"
+            paths = [self.__file_path, self.__binary_path()]
+            if binary:
+                paths.reverse()
+            names = set(view[0]) | set(view[2])
+            parts = self.__group(view, names, dirty, binary).get(None, [])
+            self.__write(paths[0], parts, binary)
+            if os.path.exists(paths[1]):
+                os.remove(paths[1])
+            if os.path.isdir(self.__file_path + ".d"):
+                shutil.rmtree(self.__file_path + ".d")
+        if self.__journaled or os.path.exists(self.__file_path + ".log"):
+            open(self.__file_path + ".log", 'w').close()
+        self.__written()
+        self.__journaled = 0
+        self.__stale.clear()
 
     def reload(self):
-        """deserializes the JSON file to __objects"""
+        """deserializes the JSON file, or the shard files, to __objects,
+        then replays the journal on top of it"""
+        with self.__mutex, self.__lock(), self.__writing():
+            self.__reload(parallel=True)
+
+    def __reload(self, parallel=False):
+        """loads the snapshot and the journal, with the lock file held,
+        parsing the shards in worker processes if parallel is True"""
+        self.__seen = self.__signature()
+        self.__generation = self.__shared_generation()
+        directory = self.__file_path + ".d"
+        binary_path = self.__binary_path()
+        if os.path.isdir(directory) and (
+                self.__shards or not os.path.exists(self.__file_path)):
+            try:
+                self.__reload_shards(directory, parallel)
+            except Exception:
+                pass
+        elif os.path.exists(binary_path) and (
+                self.__format == "binary" or
+                not os.path.exists(self.__file_path)):
+            try:
+                for record in binary_format.read_records(binary_path):
+                    if self.__lazy:
+                        self.__stash(record.key, record)
+                    else:
+                        self.__restore(record.key, record.decode())
+            except Exception:
+                pass
+        else:
+            try:
+                with open(self.__file_path, 'r') as f:
+                    if self.__lazy:
+                        for key, value, text in iter_items(f, text=True):
+                            self.__stash(key, value, text)
+                    else:
+                        for key, value in iter_items(f):
+                            self.__restore(key, value)
+            except Exception:
+                pass
+        self.__replay()
+
+    def __reload_shards(self, directory, parallel=False):
+        """loads the shard files in directory, parsing them in forked
+        worker processes if parallel is True and workers are configured,
+        as long as this process runs a single thread"""
+        paths = [os.path.join(directory, name)
+                 for name in sorted(os.listdir(directory))
+                 if name.endswith(".json")]
+        build = not self.__lazy
+        workers = min(len(paths), self.__reload_workers) if parallel else 0
+        if workers > 1 and threading.active_count() == 1 and \
+                "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+            with ProcessPoolExecutor(workers, mp_context=context) as pool:
+                results = list(pool.map(load_shard, paths,
+                                        [build] * len(paths)))
+        else:
+            results = [load_shard(path, build) for path in paths]
+        for records in results:
+            for key, value, text in records:
+                if build:
+                    self.__load(key, value)
+                else:
+                    self.__stash(key, value, text)
+
+    def __replay(self):
+        """applies the journal entries appended since the last compaction,
+        marking their keys stale for the next compaction, and cuts off a
+        trailing entry torn by a crash"""
+        path = self.__file_path + ".log"
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
-        except Exception:
-            pass
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return
+        end = data.rfind(b"\n") + 1
+        entries = 0
+        for line in data[:end].splitlines():
+            try:
+                key, value = json.loads(line.decode("utf-8"))
+                if value is None:
+                    self.__unload(key)
+                else:
+                    self.__restore(key, value)
+                self.__stale.add(key)
+                entries += 1
+            except Exception:
+                pass
+        if end < len(data):
+            with open(path, 'r+b') as f:
+                f.truncate(end)
+            self.__seen = self.__signature()
+        self.__journaled = entries
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            with self.__writing():
+                if key in self.__objects:
+                    self.__unload(key)
+                    self.__dirty.discard(key)
+                    self.__deleted.add(key)
+
+    def __signature(self):
+        """returns the inode, size and mtime of the JSON file, the journal,
+        the shard directory and the binary file"""
+        signature = ()
+        for path in (self.__file_path, self.__file_path + ".log",
+                     self.__file_path + ".d", self.__binary_path()):
+            try:
+                st = os.stat(path)
+                signature += ((st.st_ino, st.st_size, st.st_mtime_ns),)
+            except OSError:
+                signature += (None,)
+        return signature
+
+    def __counter(self):
+        """returns the memory map of the lock file of __file_path, opened
+        again in a forked child so that its locks are its own"""
+        path = self.__file_path + ".lock"
+        opened = self.__lock_file
+        if opened is None or opened[:2] != (path, os.getpid()):
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            if os.fstat(fd).st_size < GENERATION.size:
+                os.ftruncate(fd, GENERATION.size)
+            opened = (path, os.getpid(), fd,
+                      mmap.mmap(fd, GENERATION.size))
+            self.__lock_file = opened
+        return opened[3]
+
+    def __shared_generation(self):
+        """returns the generation counter of the lock file, or 0 when the
+        files are not locked"""
+        if not self.__locking:
+            return 0
+        return GENERATION.unpack_from(self.__counter())[0]
+
+    @contextmanager
+    def __lock(self, exclusive=False):
+        """holds the lock file, shared or exclusive, for the block; an
+        exclusive holder first loads what other processes saved"""
+        if not self.__locking or self.__lock_depth:
+            yield
+            return
+        self.__counter()
+        fd = self.__lock_file[2]
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        self.__lock_depth = 1
+        try:
+            if exclusive and self.__shared_generation() != self.__generation:
+                with self.__writing():
+                    self.__refresh()
+            yield
+        finally:
+            self.__lock_depth = 0
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def __written(self):
+        """records the files as saved and, when they are locked, tells the
+        other processes by incrementing the generation counter"""
+        self.__seen = self.__signature()
+        if self.__locking:
+            self.__generation = self.__shared_generation() + 1
+            GENERATION.pack_into(self.__counter(), 0, self.__generation)
+
+    def __refresh(self):
+        """reloads the files saved by another process, then applies the
+        changes not saved yet on top of them"""
+        pending = dict((key, self.__objects[key]) for key in self.__dirty
+                       if key in self.__objects)
+        deleted = set(self.__deleted)
+        for key in list(self.__objects):
+            self.__unload(key)
+        self.__tops()[2].clear()
+        self.__reload()
+        for key, obj in pending.items():
+            self.__load(key, obj)
+            self.__dirty.add(key)
+        for key in deleted:
+            self.__unload(key)
+            self.__deleted.add(key)
 
     def close(self):
-        """call reload() method for deserializing the JSON file to objects"""
-        self.reload()
+        """reloads the files, keeping the changes not written yet, unless
+        they have not changed since they were loaded or saved, and unpins
+        the snapshot of this thread"""
+        self.unpin()
+        if self.__locking:
+            if self.__shared_generation() != self.__generation:
+                with self.__mutex, self.__lock(), self.__writing():
+                    if self.__shared_generation() != self.__generation:
+                        self.__refresh()
+        elif self.__signature() != self.__seen:
+            with self.__mutex, self.__writing():
+                if self.__signature() != self.__seen:
+                    self.__refresh()
 
-    def get(self, cls, id):
+    def get(self, cls, id, load=(), fields=None):
         """Retrieves a single object from the storage"""
-        if cls and id and self.__objects:
-            key = '{}.{}'.format(cls.__name__, id)
-            if key in self.__objects:
-                return self.__objects[key]
+        if cls and id:
+            name = cls.__name__
+            key = '{}.{}'.format(name, id)
+            by_class, children, raw, objects = self.__view()
+            obj = by_class.get(name, self.__empty).get(key)
+            if obj is None and key in raw.get(name, ()):
+                self.__built(name, key)
+                obj = self.__objects.get(key)
+            return obj
         return None
 
+    def get_many(self, cls, ids, load=()):
+        """Retrieves the objects of class cls with the given ids, in the
+        order of ids and skipping the missing ones"""
+        objs = (self.get(cls, id) for id in ids)
+        return [obj for obj in objs if obj is not None]
+
     def count(self, cls=None):
         """Returns the number of objs matching the given class or all objs"""
-        num_of_objs = 0
+        by_class, children, raw, objects = self.__view()
         if cls:
-            for obj in self.__objects.values():
-                if isinstance(obj, cls):
-                    num_of_objs += 1
-            return num_of_objs
-        else:
-            num_of_objs = len(self.__objects)
-        return num_of_objs
+            name = cls if isinstance(cls, str) else cls.__name__
+            return (len(by_class.get(name, ())) + len(raw.get(name, ())))
+        return sum(map(len, by_class.values())) + sum(map(len, raw.values()))
+
+    def count_many(self, clss=None, approximate=False):
+        """Returns the number of objs of each class of clss, or of every
+        class, by class name, all read from the same snapshot"""
+        by_class, children, raw, objects = self.__view()
+        return {name: len(by_class.get(name, ())) + len(raw.get(name, ()))
+                for name in classes
+                if clss is None or name in clss or classes[name] in clss}
@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+"""
+Contains iter_items, an incremental reader for the JSON file of FileStorage
+"""
+
+import json
+import re
+from sys import intern
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def iter_items(f, chunk_size=65536, text=False):
+    """yields the ("<class name>.id", dict) pairs of the JSON object read
+    from the text file f one at a time, holding at most one record and one
+    chunk of text in memory, or ("<class name>.id", dict, JSON text of the
+    dict) triples if text is True"""
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    expect = "{"
+    while True:
+        pos = WHITESPACE.match(buf, pos).end()
+        if pos == len(buf) and not eof:
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+        if pos == len(buf):
+            if expect == "{":
+                return
+            raise ValueError("truncated JSON object")
+        char = buf[pos]
+        if expect == "{":
+            if char != "{":
+                raise ValueError("expected '{' at start of JSON object")
+            pos += 1
+            expect = "first key"
+        elif expect in (",", "first key") and char == "}":
+            return
+        elif expect == ",":
+            if char != ",":
+                raise ValueError("expected ',' or '}' between items")
+            pos += 1
+            expect = "key"
+        elif expect == ":":
+            if char != ":":
+                raise ValueError("expected ':' after key")
+            pos += 1
+            expect = "value"
+        else:
+            start = pos
+            try:
+                token, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+            pos = end
+            if expect == "value":
+                if type(token) is dict:
+                    # share attribute names between records like the
+                    # memo of json.load does
+                    token = {intern(k): v for k, v in token.items()}
+                if text:
+                    yield key, token, buf[start:end]
+                else:
+                    yield key, token
+                expect = ","
+            else:
+                if type(token) is not str:
+                    raise ValueError("expected a string key")
+                key = token
+                expect = ":"
@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+"""
+Contains the cursors of the keyset pagination shared by the storages
+"""
+
+import base64
+from datetime import datetime
+import heapq
+import json
+from models.base_model import time
+
+# attributes a page can be ordered by, the id breaking the ties
+ORDERS = ("created_at", "name")
+
+
+def cursor(obj, order):
+    """returns the cursor of the page starting after obj, in the order of
+    its attribute order"""
+    value = getattr(obj, order)
+    if isinstance(value, datetime):
+        value = value.strftime(time)
+    data = json.dumps([value, obj.id]).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def position(cursor, order):
+    """returns the (value of order, id) key a cursor starts after, raising
+    ValueError when it is not a cursor of that order"""
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, id = json.loads(data)
+        if order == "created_at":
+            value = datetime.strptime(value, time)
+        elif value is not None and not isinstance(value, str):
+            raise TypeError("invalid name {!r}".format(value))
+        if not isinstance(id, str):
+            raise TypeError("invalid id {!r}".format(id))
+    except (TypeError, ValueError):
+        raise ValueError("invalid cursor {!r}".format(cursor))
+    return value, id
+
+
+def sort_key(value, id):
+    """returns the sort key of the (value, id) key, an unset value coming
+    first as in the databases"""
+    return (value is not None, value, id)
+
+
+def paginate(objs, limit, after=None, order="created_at"):
+    """returns the first limit objects of objs in (order, id) order that
+    come after the cursor after, and the cursor of the next page or None,
+    in one pass over objs whatever the depth of the page"""
+    def key(obj):
+        """returns the sort key of obj"""
+        return sort_key(getattr(obj, order), obj.id)
+    if after is not None:
+        start = sort_key(*position(after, order))
+        objs = (obj for obj in objs if key(obj) > start)
+    page = heapq.nsmallest(limit + 1, objs, key=key)
+    if len(page) > limit:
+        return page[:limit], cursor(page[limit - 1], order)
+    return page, None
@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+"""
+Contains the Bucket class, the persistent mapping that FileStorage
+snapshots are made of
+"""
+
+from collections.abc import Mapping
+
+# number of partitions of a Bucket
+PARTS = 64
+
+
+class Bucket(Mapping):
+    """A read-only mapping split into partitions by key hash
+
+    edit() returns a copy sharing every partition with the original; the
+    copy can be changed, which copies only the partitions it touches,
+    until it is frozen.
+    """
+    __slots__ = ("_parts", "_length", "_owned")
+
+    def __init__(self):
+        """creates an empty, frozen bucket"""
+        self._parts = [{}] * PARTS
+        self._length = 0
+        self._owned = None
+
+    def __getitem__(self, key):
+        """returns the value of key"""
+        return self._parts[hash(key) % PARTS][key]
+
+    def __contains__(self, key):
+        """returns whether key is in the bucket"""
+        return key in self._parts[hash(key) % PARTS]
+
+    def get(self, key, default=None):
+        """returns the value of key, or default"""
+        return self._parts[hash(key) % PARTS].get(key, default)
+
+    def __iter__(self):
+        """iterates over the keys"""
+        for part in self._parts:
+            yield from part
+
+    def __len__(self):
+        """returns the number of keys"""
+        return self._length
+
+    def __repr__(self):
+        """returns the representation of the bucket"""
+        return "Bucket({!r})".format(dict(self))
+
+    def edit(self):
+        """returns a copy that can be changed until it is frozen"""
+        copy = Bucket.__new__(Bucket)
+        copy._parts = list(self._parts)
+        copy._length = self._length
+        copy._owned = set()
+        return copy
+
+    def freeze(self):
+        """makes the bucket read-only"""
+        self._owned = None
+
+    def __part(self, key):
+        """returns the partition of key, copied first unless this copy
+        already did"""
+        if self._owned is None:
+            raise TypeError("'Bucket' object is read-only")
+        i = hash(key) % PARTS
+        if i not in self._owned:
+            self._parts[i] = dict(self._parts[i])
+            self._owned.add(i)
+        return self._parts[i]
+
+    def __setitem__(self, key, value):
+        """sets the value of key in a bucket being edited"""
+        part = self.__part(key)
+        if key not in part:
+            self._length += 1
+        part[key] = value
+
+    def pop(self, key, default=None):
+        """removes key from a bucket being edited and returns its value"""
+        if key not in self:
+            return default
+        self._length -= 1
+        return self.__part(key).pop(key)
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+"""
+Contains the class SQLiteStorage
+"""
+
+from models.engine.db_storage import DBStorage
+from os import getenv
+from sqlalchemy import create_engine, event
+from time import monotonic
+
+
+def set_pragmas(dbapi_connection, connection_record):
+    """turns on WAL mode and foreign keys for a new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def limit_statements(engine, timeout):
+    """makes SQLite interrupt a statement of engine that runs for more than
+    timeout milliseconds"""
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection, connection_record):
+        """checks the deadline of the running statement every 1000 virtual
+        machine instructions"""
+        info = connection_record.info
+        info["deadline"] = None
+        dbapi_connection.set_progress_handler(
+            lambda: info["deadline"] is not None and
+            monotonic() > info["deadline"], 1000)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start(conn, cursor, statement, parameters, context, executemany):
+        """sets the deadline of the statement"""
+        conn.connection.info["deadline"] = monotonic() + timeout / 1000
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def end(conn, cursor, statement, parameters, context, executemany):
+        """clears the deadline once the statement ran"""
+        conn.connection.info["deadline"] = None
+
+
+class SQLiteStorage(DBStorage):
+    """interacts with a SQLite database through the same models as
+    DBStorage"""
+
+    def _create_engine(self, url=None):
+        """returns the engine of the SQLite database file HBNB_SQLITE_DB, or
+        of the replica at url"""
+        HBNB_SQLITE_DB = getenv('HBNB_SQLITE_DB', 'hbnb.db')
+        if url is None:
+            url = 'sqlite:///{}'.format(HBNB_SQLITE_DB)
+        engine = create_engine(url,
+                               connect_args={'check_same_thread': False},
+                               **self._pool_options())
+        event.listen(engine, 'connect', set_pragmas)
+        timeout = self._statement_timeout()
+        if timeout:
+            limit_statements(engine, timeout)
+        return engine
+
+    def _approximate_counts(self, tables):
+        """returns None as SQLite keeps no row count estimates, so that
+        the rows are counted"""
+        return None
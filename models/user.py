@@ -31,3 +31,18 @@ class User(BaseModel, Base):
             hashed_pwd = md5(kwargs['password'].encode('utf8')).hexdigest()
             kwargs['password'] = hashed_pwd
         super().__init__(*args, **kwargs)
+
+    if models.storage_t != 'db':
+        @property
+        def places(self):
+            """getter for list of place instances owned by the user"""
+            from models.place import Place
+            places = models.storage.all_by(Place, "user_id", self.id)
+            return list(places.values())
+
+        @property
+        def reviews(self):
+            """getter for list of review instances written by the user"""
+            from models.review import Review
+            reviews = models.storage.all_by(Review, "user_id", self.id)
+            return list(reviews.values())
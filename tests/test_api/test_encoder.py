@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+"""
+Contains the TestEncoderDocs and TestModelJSONProvider classes
+"""
+
+from api.v1 import encoder
+from datetime import datetime
+from flask import Flask, jsonify
+import importlib
+import inspect
+from models.state import State
+import pep8
+import sys
+import unittest
+from unittest.mock import patch
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class TestEncoderDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the encoder"""
+    def test_pep8_conformance_encoder(self):
+        """Test that api/v1/encoder.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/encoder.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_encoder_module_docstring(self):
+        """Test for the encoder.py module docstring"""
+        self.assertIsNot(encoder.__doc__, None,
+                         "encoder.py needs a docstring")
+        self.assertTrue(len(encoder.__doc__) >= 1,
+                        "encoder.py needs a docstring")
+
+    def test_provider_func_docstrings(self):
+        """Test for the presence of docstrings in ModelJSONProvider"""
+        funcs = inspect.getmembers(encoder.ModelJSONProvider,
+                                   inspect.isfunction)
+        for func in funcs:
+            if func[0] in vars(encoder.ModelJSONProvider):
+                self.assertIsNot(func[1].__doc__, None,
+                                 "{:s} needs a docstring".format(func[0]))
+
+
+class TestModelJSONProvider(unittest.TestCase):
+    """Test the API encodes as the JSON provider of Flask does"""
+    def setUp(self):
+        """Create a state created on a whole second"""
+        self.state = State(id="s1", name="Lagos",
+                           created_at=datetime(2020, 1, 1),
+                           updated_at=datetime(2020, 1, 1, 0, 0, 0, 5))
+
+    def app(self, module):
+        """Returns a Flask app encoding with the encoder imported while
+        sys.modules holds module as orjson"""
+        with patch.dict(sys.modules, {"orjson": module}):
+            provider = importlib.reload(encoder).ModelJSONProvider
+        self.addCleanup(importlib.reload, encoder)
+        app = Flask(__name__)
+        app.json = provider(app)
+        return app
+
+    def check(self, app):
+        """Checks app encodes the state as the default provider does its
+        dictionary, compact and indented"""
+        for compact in (None, False):
+            baseline = Flask(__name__)
+            baseline.json.compact = app.json.compact = compact
+            with baseline.app_context():
+                expected = jsonify(self.state.to_dict()).get_data()
+            with app.app_context():
+                data = self.state.to_dict(datetimes=True)
+                self.assertEqual(jsonify(data).get_data(), expected)
+                self.assertEqual(app.json.loads(expected),
+                                 self.state.to_dict())
+        self.assertIn(b'"2020-01-01T00:00:00.000000"', expected)
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    def test_orjson(self):
+        """Test the orjson encoder keeps zero microseconds"""
+        app = self.app(orjson)
+        self.assertTrue(app.json.fast)
+        self.check(app)
+
+    def test_standard_library(self):
+        """Test the json module encoder keeps zero microseconds"""
+        app = self.app(None)
+        self.assertFalse(app.json.fast)
+        self.check(app)
+
+if __name__ == "__main__":
+    unittest.main()
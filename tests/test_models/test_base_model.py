@@ -138,12 +138,54 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(new_d["created_at"], bm.created_at.strftime(t_format))
         self.assertEqual(new_d["updated_at"], bm.updated_at.strftime(t_format))
 
+    def test_to_dict_fields(self):
+        """test that to_dict(fields) returns only the listed keys"""
+        t_format = "%Y-%m-%dT%H:%M:%S.%f"
+        bm = BaseModel()
+        bm.name = "Holberton"
+        self.assertEqual(bm.to_dict(["id", "name", "missing"]),
+                         {"id": bm.id, "name": "Holberton"})
+        self.assertEqual(bm.to_dict(["created_at", "__class__"]),
+                         {"created_at": bm.created_at.strftime(t_format),
+                          "__class__": "BaseModel"})
+        self.assertEqual(bm.to_dict([]), {})
+
+    def test_to_dict_datetimes(self):
+        """test that to_dict(datetimes=True) leaves the datetimes as is"""
+        bm = BaseModel()
+        d = bm.to_dict(datetimes=True)
+        self.assertIs(d["created_at"], bm.created_at)
+        self.assertIs(d["updated_at"], bm.updated_at)
+        self.assertEqual(bm.to_dict(["updated_at"], datetimes=True),
+                         {"updated_at": bm.updated_at})
+
+    def test_iso_datetimes(self):
+        """test that kwargs may hold ISO 8601 datetimes without
+        microseconds, as the API encodes them"""
+        bm = BaseModel(created_at="2017-09-28T21:03:54",
+                       updated_at="2017-09-28T21:03:54.052302")
+        self.assertEqual(bm.created_at, datetime(2017, 9, 28, 21, 3, 54))
+        self.assertEqual(bm.updated_at,
+                         datetime(2017, 9, 28, 21, 3, 54, 52302))
+
     def test_str(self):
         """test that the str method has the correct output"""
         inst = BaseModel()
         string = "[BaseModel] ({}) {}".format(inst.id, inst.__dict__)
         self.assertEqual(string, str(inst))
 
+    @unittest.skipIf(models.storage_t == 'db', "not testing File Storage")
+    def test_setattr_after_init(self):
+        """test that the storage is told of the changes to an instance,
+        but not of the attributes set by __init__"""
+        with mock.patch.object(models.storage, "changed") as changed:
+            inst = BaseModel(id="1", name="a",
+                             created_at="2017-09-28T21:03:54.052302")
+            BaseModel()
+            changed.assert_not_called()
+            inst.name = "b"
+            changed.assert_called_once_with(inst, "name", "a")
+
     @mock.patch('models.storage')
     def test_save(self, mock_storage):
         """Test that save method updates `updated_at` and calls
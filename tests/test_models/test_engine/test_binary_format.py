@@ -0,0 +1,122 @@
+#!/usr/bin/python3
+"""
+Contains the TestBinaryFormatDocs and TestBinaryFormat classes
+"""
+
+from datetime import datetime
+import inspect
+import json
+from models.engine import binary_format
+import os
+import pep8
+import tempfile
+import unittest
+
+
+class TestBinaryFormatDocs(unittest.TestCase):
+    """Tests to check the documentation and style of binary_format"""
+    def test_pep8_conformance_binary_format(self):
+        """Test that models/engine/binary_format.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/binary_format.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_binary_format_module_docstring(self):
+        """Test for the binary_format.py module docstring"""
+        self.assertIsNot(binary_format.__doc__, None,
+                         "binary_format.py needs a docstring")
+        self.assertTrue(len(binary_format.__doc__) >= 1,
+                        "binary_format.py needs a docstring")
+
+    def test_binary_format_func_docstrings(self):
+        """Test for the presence of docstrings in binary_format functions"""
+        funcs = inspect.getmembers(binary_format, inspect.isfunction)
+        funcs += inspect.getmembers(binary_format.LazyRecord,
+                                    inspect.isfunction)
+        for func in funcs:
+            self.assertTrue(len(func[1].__doc__ or "") >= 1,
+                            "{:s} needs a docstring".format(func[0]))
+
+
+class TestBinaryFormat(unittest.TestCase):
+    """Test the encoding and the files of binary_format"""
+    def setUp(self):
+        """Set up records with every supported type"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.attrs = {
+            "__class__": "Place",
+            "id": "1",
+            "created_at": datetime(2017, 9, 28, 21, 3, 54, 52298),
+            "updated_at": datetime(1960, 1, 1),
+            "name": "Chez l'été",
+            "number_rooms": -3,
+            "big": 2 ** 70,
+            "latitude": 37.5,
+            "description": None,
+            "flag": True,
+            "off": False,
+            "amenity_ids": ["a", "b", 1],
+            "extra": {"nested": [1, 2]}}
+
+    def tearDown(self):
+        """Remove the temporary files"""
+        self.tmp.cleanup()
+
+    def test_record_round_trip(self):
+        """Test a record decodes to the attributes it was made of"""
+        record = binary_format.encode_record("Place.1", self.attrs)
+        self.assertEqual(binary_format.decode_record(record),
+                         ("Place.1", self.attrs))
+
+    def test_read_records(self):
+        """Test records are found through the table of the file"""
+        path = os.path.join(self.tmp.name, "file.bin")
+        records = []
+        for i in range(5):
+            attrs = dict(self.attrs, id=str(i))
+            records.append(binary_format.encode_record("Place." + str(i),
+                                                       attrs))
+        with open(path, "wb") as f:
+            f.write(binary_format.pack(records))
+        read = binary_format.read_records(path)
+        self.assertEqual([record.key for record in read],
+                         ["Place." + str(i) for i in range(5)])
+        self.assertEqual(read[3].decode(), dict(self.attrs, id="3"))
+        self.assertEqual(read[3].data, records[3])
+
+    def test_empty_and_invalid_files(self):
+        """Test an empty file has no records and a foreign one is refused"""
+        path = os.path.join(self.tmp.name, "file.bin")
+        open(path, "wb").close()
+        self.assertEqual(binary_format.read_records(path), [])
+        with open(path, "wb") as f:
+            f.write(b"{}" * 10)
+        with self.assertRaises(ValueError):
+            binary_format.read_records(path)
+
+    def test_converters(self):
+        """Test converting file.json to binary and back keeps the data"""
+        objects = {
+            "State.1": {"__class__": "State", "id": "1", "name": "Lagos",
+                        "created_at": "2017-09-28T21:03:54.052298",
+                        "updated_at": "2017-09-28T21:03:54.052302"},
+            "Place.2": {"__class__": "Place", "id": "2", "max_guest": 4,
+                        "latitude": 1.5, "amenity_ids": ["x"],
+                        "created_at": "2017-09-28T21:03:54.000000",
+                        "updated_at": "2017-09-28T21:03:54.000001"}}
+        src = os.path.join(self.tmp.name, "file.json")
+        binary = os.path.join(self.tmp.name, "file.bin")
+        dst = os.path.join(self.tmp.name, "back.json")
+        with open(src, "w") as f:
+            json.dump(objects, f)
+        binary_format.json_to_binary(src, binary)
+        read = binary_format.read_records(binary)
+        self.assertEqual(read[0].decode()["created_at"],
+                         datetime(2017, 9, 28, 21, 3, 54, 52298))
+        binary_format.binary_to_json(binary, dst)
+        with open(dst, "r") as f:
+            self.assertEqual(json.load(f), objects)
+
+if __name__ == "__main__":
+    unittest.main()
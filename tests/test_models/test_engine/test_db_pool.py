@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+"""
+Contains the TestDBPoolDocs and TestMeteredPool classes
+"""
+
+import inspect
+import multiprocessing
+from models.engine import db_pool
+import os
+import pep8
+import tempfile
+import unittest
+from sqlalchemy import create_engine, exc, text
+MeteredPool = db_pool.MeteredPool
+
+
+class TestDBPoolDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the db_pool module"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.funcs = [(name, func) for name, func in vars(MeteredPool).items()
+                     if inspect.isfunction(func)]
+
+    def test_pep8_conformance_db_pool(self):
+        """Test that models/engine/db_pool.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/db_pool.py',
+                                    'tests/test_models/test_engine/'
+                                    'test_db_pool.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_db_pool_module_docstring(self):
+        """Test for the db_pool.py module docstring"""
+        self.assertTrue(len(db_pool.__doc__ or "") >= 1,
+                        "db_pool.py needs a docstring")
+
+    def test_metered_pool_class_docstring(self):
+        """Test for the MeteredPool class docstring"""
+        self.assertTrue(len(MeteredPool.__doc__ or "") >= 1,
+                        "MeteredPool class needs a docstring")
+
+    def test_db_pool_func_docstrings(self):
+        """Test for the presence of docstrings in db_pool functions"""
+        for func in self.funcs + [("guard_forks", db_pool.guard_forks)]:
+            self.assertTrue(len(func[1].__doc__ or "") >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestMeteredPool(unittest.TestCase):
+    """Test MeteredPool and guard_forks on a SQLite database file"""
+    def setUp(self):
+        """Create an engine with a pool of one connection and one more in
+        overflow"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(
+            "sqlite:///" + os.path.join(self.tmp.name, "pool.db"),
+            connect_args={"check_same_thread": False},
+            poolclass=MeteredPool, pool_size=1, max_overflow=1,
+            pool_timeout=0.05)
+        db_pool.guard_forks(self.engine)
+
+    def tearDown(self):
+        """Close the connections and remove the database"""
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_metrics(self):
+        """Test checkouts, overflows and timeouts are counted"""
+        first = self.engine.connect()
+        second = self.engine.connect()
+        metrics = self.engine.pool.metrics()
+        self.assertEqual(metrics["checked_out"], 2)
+        self.assertEqual(metrics["overflow"], 1)
+        self.assertEqual(metrics["overflows"], 1)
+        with self.assertRaises(exc.TimeoutError):
+            self.engine.connect()
+        second.close()
+        first.close()
+        self.engine.connect().close()
+        metrics = self.engine.pool.metrics()
+        self.assertEqual(metrics["checked_out"], 0)
+        self.assertEqual(metrics["checkouts"], 3)
+        self.assertEqual(metrics["timeouts"], 1)
+        self.assertGreaterEqual(metrics["wait_max"], 0)
+        self.assertGreaterEqual(metrics["wait_total"], metrics["wait_max"])
+
+    @unittest.skipIf("fork" not in multiprocessing.get_all_start_methods(),
+                     "no fork")
+    def test_forked_child_opens_its_own_connection(self):
+        """Test a forked child does not reuse a connection of its parent"""
+        with self.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+        def child():
+            with self.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                info = connection.connection.info
+                os._exit(0 if info["pid"] == os.getpid() else 1)
+        process = multiprocessing.get_context("fork").Process(target=child)
+        process.start()
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(self.engine.pool.metrics()["checked_in"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
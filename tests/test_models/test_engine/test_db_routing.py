@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+"""
+Contains the TestDBRoutingDocs and TestRoutingSession classes
+"""
+
+import inspect
+from models.engine import db_routing
+import os
+import pep8
+import tempfile
+import unittest
+from sqlalchemy import Column, MetaData, String, Table, create_engine, text
+RoutingSession = db_routing.RoutingSession
+
+
+class TestDBRoutingDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the db_routing
+    module"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.funcs = [(name, func)
+                     for name, func in vars(RoutingSession).items()
+                     if inspect.isfunction(func)]
+
+    def test_pep8_conformance_db_routing(self):
+        """Test that models/engine/db_routing.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/db_routing.py',
+                                    'tests/test_models/test_engine/'
+                                    'test_db_routing.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_db_routing_module_docstring(self):
+        """Test for the db_routing.py module docstring"""
+        self.assertTrue(len(db_routing.__doc__ or "") >= 1,
+                        "db_routing.py needs a docstring")
+
+    def test_routing_session_class_docstring(self):
+        """Test for the RoutingSession class docstring"""
+        self.assertTrue(len(RoutingSession.__doc__ or "") >= 1,
+                        "RoutingSession class needs a docstring")
+
+    def test_db_routing_func_docstrings(self):
+        """Test for the presence of docstrings in RoutingSession methods"""
+        for func in self.funcs:
+            self.assertTrue(len(func[1].__doc__ or "") >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestRoutingSession(unittest.TestCase):
+    """Test RoutingSession with two SQLite files standing in for the
+    primary and the replica"""
+    def setUp(self):
+        """Create the primary and the replica, each with a row telling
+        them apart"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.table = Table("places", MetaData(),
+                           Column("id", String(60), primary_key=True))
+        self.primary, self.replica = [
+            create_engine("sqlite:///" + os.path.join(self.tmp.name, name))
+            for name in ("primary.db", "replica.db")]
+        for engine, row in ((self.primary, "p"), (self.replica, "r")):
+            self.table.metadata.create_all(engine)
+            with engine.begin() as connection:
+                connection.execute(self.table.insert(), {"id": row})
+        self.session = RoutingSession(bind=self.primary,
+                                      replicas=[self.replica])
+
+    def tearDown(self):
+        """Close the session and remove the databases"""
+        self.session.close()
+        self.primary.dispose()
+        self.replica.dispose()
+        self.tmp.cleanup()
+
+    def rows(self):
+        """Returns the ids read through the session"""
+        result = self.session.execute(text("SELECT id FROM places"))
+        return result.scalars().all()
+
+    def test_reads_from_replica_until_it_writes(self):
+        """Test reads go to the replica, and every statement goes to the
+        primary once the session wrote"""
+        self.assertEqual(self.rows(), ["r"])
+        self.session.execute(self.table.insert(), {"id": "p2"})
+        self.assertEqual(sorted(self.rows()), ["p", "p2"])
+        self.session.commit()
+        self.assertEqual(sorted(self.rows()), ["p", "p2"])
+
+    def test_use_primary(self):
+        """Test use_primary sends reads to the primary"""
+        self.session.use_primary()
+        self.assertEqual(self.rows(), ["p"])
+
+    def test_without_replicas(self):
+        """Test a session without replicas uses the primary"""
+        self.session.close()
+        self.session = RoutingSession(bind=self.primary)
+        self.assertEqual(self.rows(), ["p"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -103,19 +103,16 @@ class TestDBStorage(unittest.TestCase):
     def test_get_existing_object(self):
         """Test retrieving an existing object"""
         mock_user = User(id="1234")
-        mock_query = MagicMock()
-        mock_query.filter_by.return_value.first.return_value = mock_user
-        self.mock_session.query.return_value = mock_query  # Mock query execution
+        self.mock_session.get.return_value = mock_user  # Mock identity lookup
         
         result = self.storage.get(User, "1234")
         self.assertEqual(result, mock_user)
+        self.mock_session.get.assert_called_once_with(User, "1234")
 
     @unittest.skipIf(DBStorage.__name__ != 'DBStorage', "not testing db storage")
     def test_get_non_existing_object(self):
         """Test retrieving a non-existing object"""
-        mock_query = MagicMock()
-        mock_query.filter_by.return_value.first.return_value = None
-        self.mock_session.query.return_value = mock_query
+        self.mock_session.get.return_value = None
         
         result = self.storage.get(User, "5678")
         self.assertIsNone(result)
@@ -15,9 +15,16 @@ from models.review import Review
 from models.state import State
 from models.user import User
 import json
+import multiprocessing
 import os
 import pep8
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
+from unittest.mock import patch
 FileStorage = file_storage.FileStorage
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
@@ -150,6 +157,26 @@ class TestFileStorage(unittest.TestCase):
         obj = self.storage.get(User, None)
         self.assertIsNone(obj)
 
+    def test_get_many(self):
+        """Test get_many returns the objects found, in the order of ids"""
+        self.assertEqual(self.storage.get_many(User, ["456", "999", "123"]),
+                         [self.user2, self.user1])
+        self.assertEqual(self.storage.get_many(User, []), [])
+
+    def test_page(self):
+        """Test page walks the objects of a class in (order, id) order"""
+        for i in range(3):
+            self.storage.new(City(id="c{}".format(i), name=str(2 - i),
+                                  state_id="s1" if i else "s2"))
+        page, after = self.storage.page(User, 1)
+        self.assertEqual(page, [self.user1])
+        self.assertEqual(self.storage.page(User, 1, after),
+                         ([self.user2], None))
+        page, after = self.storage.page(City, 5, order="name",
+                                        attr="state_id", value="s1")
+        self.assertEqual([c.id for c in page], ["c2", "c1"])
+        self.assertIsNone(after)
+
     def test_count_all_objects(self):
         """Test count method for all objects"""
         self.assertEqual(self.storage.count(), 2)
@@ -163,6 +190,899 @@ class TestFileStorage(unittest.TestCase):
         self.storage._FileStorage__objects = {}
         self.assertEqual(self.storage.count(), 0)
 
+    def test_count_is_per_class(self):
+        """Test count only counts objects of the given class"""
+        state = State(id="789", name="Lagos")
+        self.storage.new(state)
+        self.assertEqual(self.storage.count(User), 2)
+        self.assertEqual(self.storage.count(State), 1)
+        self.assertEqual(self.storage.count("State"), 1)
+        self.assertEqual(self.storage.count(City), 0)
+        self.assertEqual(self.storage.count(), 3)
+
+    def test_count_many(self):
+        """Test count_many counts several classes at once"""
+        self.storage.new(State(id="789", name="Lagos"))
+        self.assertEqual(self.storage.count_many([User, "State", City]),
+                         {"User": 2, "State": 1, "City": 0})
+        counts = self.storage.count_many()
+        self.assertEqual(set(counts), set(classes))
+        self.assertEqual(sum(counts.values()), 3)
+
+    def test_all_class_view_is_a_snapshot(self):
+        """Test all(cls) is not changed by a later new or delete"""
+        users = self.storage.all(User)
+        self.assertEqual(set(users.keys()), {"User.123", "User.456"})
+        user3 = User(id="789")
+        self.storage.new(user3)
+        self.storage.delete(self.user1)
+        self.assertEqual(set(users.keys()), {"User.123", "User.456"})
+        self.assertEqual(set(self.storage.all(User).keys()),
+                         {"User.456", "User.789"})
+        self.assertEqual(self.storage.count(User), 2)
+        self.assertEqual(len(self.storage.all(State)), 0)
+
+    def test_iter_all(self):
+        """Test iter_all yields the objects of a class, or of all classes"""
+        state = State(id="789", name="Lagos")
+        self.storage.new(state)
+        self.assertEqual(set(self.storage.iter_all(User)),
+                         {self.user1, self.user2})
+        self.assertEqual(list(self.storage.iter_all("State")), [state])
+        self.assertEqual(list(self.storage.iter_all(City)), [])
+        self.assertEqual(set(self.storage.iter_all()),
+                         {self.user1, self.user2, state})
+
+    def test_all_by_uses_reverse_index(self):
+        """Test all_by returns the children of a parent"""
+        city1 = City(id="c1", state_id="s1")
+        city2 = City(id="c2", state_id="s2")
+        self.storage.new(city1)
+        self.storage.new(city2)
+        self.assertEqual(dict(self.storage.all_by(City, "state_id", "s1")),
+                         {"City.c1": city1})
+        self.assertEqual(len(self.storage.all_by(City, "state_id", "s3")), 0)
+        self.storage.delete(city1)
+        self.assertEqual(len(self.storage.all_by(City, "state_id", "s1")), 0)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_all_by_follows_foreign_key_updates(self):
+        """Test the reverse index follows a changed foreign key"""
+        review = Review(id="r1", place_id="p1", user_id="123")
+        self.storage.new(review)
+        review.place_id = "p2"
+        self.assertEqual(
+            len(self.storage.all_by(Review, "place_id", "p1")), 0)
+        self.assertIs(self.storage.all_by(Review, "place_id", "p2")
+                      ["Review.r1"], review)
+        setattr(review, "user_id", "456")
+        with patch("models.storage", self.storage):
+            self.assertEqual(self.user2.reviews, [review])
+            self.assertEqual(self.user1.reviews, [])
+
+    def test_all_by_unindexed_attribute(self):
+        """Test all_by falls back to a scan for other attributes"""
+        self.assertEqual(list(self.storage.all_by(User, "email",
+                                                  "user2@example.com")),
+                         ["User.456"])
+
+    def test_all_class_view_is_read_only(self):
+        """Test all(cls) can not be used to mutate the storage"""
+        with self.assertRaises(TypeError):
+            self.storage.all(User)["User.789"] = User(id="789")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_streamed_response_reads_one_snapshot(self):
+        """Test a streamed response reads the objects as they are when it
+        starts, and closes the storage once, when it ends"""
+        from api.v1.app import app
+        wifi = Amenity(name="Wifi")
+        places = [Place(name=str(i), amenity_ids=[wifi.id])
+                  for i in range(150)]
+        for obj in [wifi] + places:
+            models.storage.new(obj)
+        self.addCleanup(lambda: [models.storage.delete(obj)
+                                 for obj in [wifi] + places])
+        with patch.object(models.storage, "close",
+                          wraps=models.storage.close) as close:
+            response = app.test_client().post(
+                "/api/v1/places_search", json={"amenities": [wifi.id]},
+                buffered=False)
+            chunks = iter(response.response)
+            body = next(chunks)
+            models.storage.delete(wifi)
+            body += b"".join(chunks)
+            response.close()
+            self.assertEqual(close.call_count, 1)
+        self.assertEqual(len(json.loads(body)), 150)
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class FileStorageTestCase(unittest.TestCase):
+    """Base of the tests of the persistence of FileStorage, each using
+    storages of their own at a temporary file"""
+    # the options of the storages made by new_storage
+    options = {"journal": True, "compact_every": 1000, "lazy": False,
+               "format": "json", "shards": 0, "reload_workers": 0,
+               "locking": False, "flush_ms": 0, "flush_every": 100}
+
+    def setUp(self):
+        """Point a journaled storage at a temporary file"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "file.json")
+        self.storage = self.new_storage()
+
+    def tearDown(self):
+        """Remove the temporary files"""
+        self.tmp.cleanup()
+
+    def new_storage(self, **options):
+        """Returns a storage of its own at the temporary file, with
+        options overriding those of the test case"""
+        return FileStorage(self.path, **dict(self.options, **options))
+
+    def read_log(self):
+        """Returns the lines of the journal"""
+        with open(self.path + ".log", "r") as f:
+            return f.read().splitlines()
+
+
+class TestFileStorageOptions(FileStorageTestCase):
+    """Test the storages of their own made by the constructor"""
+    def test_own_objects_and_options(self):
+        """Test a storage given a path keeps its objects and options to
+        itself"""
+        state = State(name="Lagos")
+        self.storage.new(state)
+        self.assertIsNone(FileStorage().get(State, state.id))
+        self.assertIsNone(self.new_storage().get(State, state.id))
+        self.storage.save()
+        self.assertEqual(len(self.read_log()), 1)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_changes_reach_own_storage(self):
+        """Test a storage given a path is told of the changes to its
+        objects"""
+        state = State(name="Lagos")
+        city = City(name="Ikeja", state_id="s1")
+        self.storage.new(state)
+        self.storage.new(city)
+        self.storage.save()
+        state.name = "Abuja"
+        city.state_id = state.id
+        self.assertEqual(list(self.storage.all_by(City, "state_id",
+                                                  state.id)),
+                         ["City." + city.id])
+        self.assertEqual(len(self.storage.all_by(City, "state_id", "s1")),
+                         0)
+        self.storage.save()
+        loaded = self.new_storage()
+        loaded.reload()
+        self.assertEqual(loaded.get(State, state.id).name, "Abuja")
+        self.assertEqual(loaded.get(City, city.id).state_id, state.id)
+
+    def test_invalid_options(self):
+        """Test options need a path and must be known"""
+        with self.assertRaises(TypeError):
+            FileStorage(lazy=True)
+        with self.assertRaises(TypeError):
+            FileStorage(self.path, compress=True)
+
+
+class TestFileStorageJournal(FileStorageTestCase):
+    """Test the journaled persistence of FileStorage"""
+    def test_save_appends_only_changes(self):
+        """Test save journals only new, changed and deleted objects"""
+        state = State(name="Lagos")
+        city = City(name="Ikeja", state_id=state.id)
+        self.storage.new(state)
+        self.storage.new(city)
+        self.storage.save()
+        self.assertEqual(len(self.read_log()), 2)
+        self.assertFalse(os.path.exists(self.path))
+        state.name = "Abuja"
+        self.storage.save()
+        self.assertEqual(len(self.read_log()), 3)
+        self.storage.delete(city)
+        self.storage.save()
+        self.assertEqual(json.loads(self.read_log()[-1]),
+                         ["City." + city.id, None])
+        self.storage.save()
+        self.assertEqual(len(self.read_log()), 4)
+
+    def test_bulk_new_and_save(self):
+        """Test bulk_new publishes the objects at once and bulk_save
+        journals each of them"""
+        state = State(name="Lagos")
+        cities = [City(name=str(i), state_id=state.id) for i in range(3)]
+        published = self.storage._FileStorage__published
+        self.storage.bulk_new([state] + cities)
+        self.assertIsNot(self.storage._FileStorage__published, published)
+        self.assertEqual(self.storage.count(City), 3)
+        with patch("models.storage", self.storage):
+            self.assertEqual(set(state.cities), set(cities))
+        self.storage.bulk_save()
+        self.assertEqual(len(self.read_log()), 4)
+        storage = self.new_storage()
+        storage.reload()
+        self.assertEqual(storage.count(City), 3)
+
+    def test_reload_replays_journal(self):
+        """Test reload replays the journal over the snapshot"""
+        state = State(name="Lagos")
+        city = City(name="Ikeja", state_id=state.id)
+        self.storage.new(state)
+        self.storage.new(city)
+        self.storage.compact()
+        state.name = "Abuja"
+        self.storage.delete(city)
+        self.storage.save()
+        storage = self.new_storage()
+        storage.reload()
+        self.assertEqual(list(storage.all().keys()), ["State." + state.id])
+        self.assertEqual(storage.get(State, state.id).name, "Abuja")
+
+    def test_compaction(self):
+        """Test the journal is folded into the snapshot"""
+        storage = self.new_storage(compact_every=3)
+        for i in range(3):
+            storage.new(State(name=str(i)))
+            storage.save()
+        self.assertEqual(self.read_log(), [])
+        with open(self.path, "r") as f:
+            self.assertEqual(len(json.load(f)), 3)
+        storage = self.new_storage()
+        storage.reload()
+        self.assertEqual(storage.count(State), 3)
+
+    def test_torn_entry_is_discarded(self):
+        """Test a partially written entry from a crash is cut off"""
+        state = State(name="Lagos")
+        self.storage.new(state)
+        self.storage.save()
+        with open(self.path + ".log", "a") as f:
+            f.write('["State.torn", {"__class__": "St')
+        storage = self.new_storage()
+        storage.reload()
+        self.assertEqual(list(storage.all().keys()), ["State." + state.id])
+        storage.new(State(id="next", name="Kano"))
+        storage.save()
+        storage = self.new_storage()
+        storage.reload()
+        self.assertEqual(sorted(storage.all().keys()),
+                         sorted(["State." + state.id, "State.next"]))
+
+    def test_crash_before_journal_truncated(self):
+        """Test replaying an already compacted journal is harmless"""
+        state = State(name="Lagos")
+        city = City(name="Ikeja", state_id=state.id)
+        self.storage.new(state)
+        self.storage.new(city)
+        self.storage.save()
+        self.storage.delete(city)
+        self.storage.save()
+        with open(self.path + ".log", "r") as f:
+            journal = f.read()
+        self.storage.compact()
+        with open(self.path + ".log", "w") as f:
+            f.write(journal)
+        storage = self.new_storage()
+        storage.reload()
+        self.assertEqual(list(storage.all().keys()), ["State." + state.id])
+
+
+class TestFileStorageClose(FileStorageTestCase):
+    """Test close reloads only the files changed by others"""
+    def test_close_skips_reload_when_unchanged(self):
+        """Test close keeps the loaded objects if no file changed"""
+        state = State(name="Lagos")
+        self.storage.new(state)
+        self.storage.save()
+        with patch.object(self.storage, "reload") as reload:
+            self.storage.close()
+            self.assertFalse(reload.called)
+        self.assertIs(self.storage.get(State, state.id), state)
+
+    def test_close_reloads_after_another_writer(self):
+        """Test close reloads once another process changed the files"""
+        self.storage.reload()
+        other = self.new_storage()
+        state = State(name="Lagos")
+        other.new(state)
+        other.save()
+        self.storage.close()
+        self.assertEqual(self.storage.get(State, state.id).name, "Lagos")
+        other.compact()
+        self.storage.close()
+        self.assertEqual(self.storage.count(State), 1)
+
+    def test_close_during_own_write_skips_reload(self):
+        """Test close waiting for a save of this process does not reload
+        the files that save wrote"""
+        self.storage.new(State(name="Lagos"))
+        self.storage.compact()
+        writing = threading.Event()
+        release = threading.Event()
+        compact = self.storage._FileStorage__compact
+
+        def slow_compact(*args):
+            os.utime(self.path, ns=(1, 1))
+            writing.set()
+            release.wait(5)
+            compact(*args)
+        with patch.object(self.storage, "_FileStorage__compact",
+                          side_effect=slow_compact), \
+                patch.object(self.storage, "_FileStorage__refresh") as refresh:
+            writer = threading.Thread(target=self.storage.compact)
+            writer.start()
+            self.assertTrue(writing.wait(5))
+            closer = threading.Thread(target=self.storage.close)
+            closer.start()
+            closer.join(0.1)
+            release.set()
+            writer.join()
+            closer.join()
+            self.assertFalse(refresh.called)
+
+
+class TestFileStorageLocking(FileStorageTestCase):
+    """Test the files shared by processes through the lock file"""
+    @unittest.skipIf(file_storage.fcntl is None, "no file locking")
+    def test_locked_close_follows_generation(self):
+        """Test close reloads only after another process saved"""
+        storage = self.new_storage(locking=True)
+        other = self.new_storage(locking=True)
+        storage.reload()
+        other.reload()
+        with patch.object(storage, "_FileStorage__refresh") as refresh:
+            storage.close()
+            self.assertFalse(refresh.called)
+        state = State(name="Lagos")
+        other.new(state)
+        other.save()
+        storage.close()
+        self.assertEqual(storage.get(State, state.id).name, "Lagos")
+        with patch.object(storage, "_FileStorage__refresh") as refresh:
+            storage.close()
+            self.assertFalse(refresh.called)
+
+    @unittest.skipIf(file_storage.fcntl is None, "no file locking")
+    def test_locked_save_keeps_other_writes(self):
+        """Test a save merges what other processes saved meanwhile"""
+        for journal in (True, False):
+            with self.subTest(journal=journal):
+                for name in os.listdir(self.tmp.name):
+                    os.remove(os.path.join(self.tmp.name, name))
+                storage = self.new_storage(journal=journal, locking=True)
+                other = self.new_storage(journal=journal, locking=True)
+                storage.reload()
+                other.reload()
+                lagos = State(name="Lagos")
+                abuja = State(name="Abuja")
+                kano = State(name="Kano")
+                storage.new(lagos)
+                other.new(abuja)
+                storage.save()
+                other.save()
+                storage.delete(lagos)
+                other.new(kano)
+                storage.save()
+                other.save()
+                reader = self.new_storage(journal=journal)
+                reader.reload()
+                self.assertEqual(sorted(reader.all(State)),
+                                 sorted(["State." + abuja.id,
+                                         "State." + kano.id]))
+                storage.close()
+                self.assertEqual(sorted(storage.all(State)),
+                                 sorted(other.all(State)))
+
+    @unittest.skipIf(file_storage.fcntl is None or "fork" not in
+                     multiprocessing.get_all_start_methods(),
+                     "no file locking or fork")
+    def test_locked_saves_from_several_processes(self):
+        """Test no save is lost when several processes write"""
+        def work():
+            storage = self.new_storage(journal=False, locking=True)
+            storage.reload()
+            for i in range(20):
+                storage.new(State(name="State {}".format(i)))
+                storage.save()
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=work) for i in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            self.assertEqual(worker.exitcode, 0)
+        storage = self.new_storage()
+        storage.reload()
+        self.assertEqual(storage.count(State), 60)
+
+
+class TestFileStorageWriteBehind(FileStorageTestCase):
+    """Test the saves written by the background thread"""
+    def wait_for(self, condition):
+        """Waits up to five seconds for condition() to be true"""
+        deadline = time.monotonic() + 5
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def test_write_behind_save(self):
+        """Test a deferred save is written by the background thread"""
+        storage = self.new_storage(journal=False, flush_ms=50)
+        state = State(name="Lagos")
+        storage.new(state)
+        with patch.object(storage, "flush") as flush:
+            storage.save()
+            self.assertFalse(flush.called)
+        self.assertTrue(self.wait_for(lambda: os.path.exists(self.path)))
+        reader = self.new_storage()
+        reader.reload()
+        self.assertEqual(reader.get(State, state.id).name, "Lagos")
+
+    def test_save_does_not_wait_for_a_write(self):
+        """Test a deferred save returns while the background thread is
+        writing the files"""
+        storage = self.new_storage(journal=False, flush_ms=1)
+        writing = threading.Event()
+        release = threading.Event()
+        compact = storage._FileStorage__compact
+
+        def slow_compact(*args):
+            writing.set()
+            release.wait(5)
+            compact(*args)
+        storage.new(State(name="Lagos"))
+        with patch.object(storage, "_FileStorage__compact",
+                          side_effect=slow_compact):
+            storage.save()
+            self.assertTrue(writing.wait(5))
+            timer = threading.Timer(2, release.set)
+            timer.start()
+            start = time.monotonic()
+            storage.new(State(name="Abuja"))
+            storage.save()
+            elapsed = time.monotonic() - start
+            release.set()
+            timer.cancel()
+            self.assertLess(elapsed, 1)
+            storage.flush()
+        reader = self.new_storage()
+        reader.reload()
+        self.assertEqual(reader.count(State), 2)
+
+    def test_write_behind_flushes_after_many_changes(self):
+        """Test enough unsaved changes are written without waiting"""
+        storage = self.new_storage(flush_ms=60000, flush_every=2)
+        storage.new(State(name="Lagos"))
+        storage.save()
+        time.sleep(0.1)
+        self.assertFalse(os.path.exists(self.path + ".log"))
+        storage.new(State(name="Abuja"))
+        storage.save()
+        self.assertTrue(self.wait_for(lambda: len(self.read_log()) == 2
+                                      if os.path.exists(self.path + ".log")
+                                      else False))
+
+    def test_flush_writes_deferred_saves(self):
+        """Test flush writes the saved changes at once"""
+        storage = self.new_storage(flush_ms=60000)
+        state = State(name="Lagos")
+        storage.new(state)
+        storage.save()
+        storage.flush()
+        self.assertEqual(len(self.read_log()), 1)
+        storage.flush()
+        self.assertEqual(len(self.read_log()), 1)
+
+    def test_close_keeps_deferred_saves(self):
+        """Test close keeps deferred saves when another process wrote"""
+        storage = self.new_storage(journal=False, flush_ms=60000)
+        other = self.new_storage(journal=False)
+        lagos = State(name="Lagos")
+        storage.new(lagos)
+        storage.save()
+        abuja = State(name="Abuja")
+        other.new(abuja)
+        other.save()
+        storage.close()
+        self.assertEqual(storage.count(State), 2)
+        storage.flush()
+        reader = self.new_storage(journal=False)
+        reader.reload()
+        self.assertEqual(reader.count(State), 2)
+
+    def test_write_behind_flushes_at_exit(self):
+        """Test deferred saves are written when the interpreter exits"""
+        code = ("from models.state import State\n"
+                "s = State(name='Lagos')\n"
+                "s.save()\n"
+                "print(s.id)\n")
+        env = dict((name, value) for name, value in os.environ.items()
+                   if not name.startswith("HBNB_"))
+        env.update(HBNB_FILE_FLUSH_MS="60000", PYTHONPATH=os.getcwd())
+        out = subprocess.run([sys.executable, "-c", code], cwd=self.tmp.name,
+                             env=env, stdout=subprocess.PIPE, check=True)
+        with open(self.path, "r") as f:
+            self.assertIn("State." + out.stdout.decode().strip(),
+                          json.load(f))
+
+
+class TestFileStorageSnapshots(FileStorageTestCase):
+    """Test the snapshots read while the objects change"""
+
+    def test_concurrent_readers_and_writers(self):
+        """Test threads can read while others write and flush"""
+        storage = self.new_storage(flush_ms=1, flush_every=10)
+        states = [State(name="State {}".format(i)) for i in range(20)]
+        for state in states:
+            storage.new(state)
+        storage.flush()
+        errors = []
+        done = threading.Event()
+
+        def read():
+            while not done.is_set():
+                for state in storage.all(State).values():
+                    storage.get(State, state.id)
+                    for city in storage.all_by(City, "state_id",
+                                               state.id).values():
+                        city.to_dict()
+                for city in storage.all(City).values():
+                    city.to_dict()
+                storage.count()
+
+        def write(n):
+            for i in range(200):
+                state = states[(n + i) % len(states)]
+                city = City(name="City {}".format(i), state_id=state.id)
+                storage.new(city)
+                state.name = "State {}".format(i)
+                storage.save()
+                storage.delete(city)
+                storage.save()
+
+        def run(target, *args):
+            try:
+                target(*args)
+            except Exception as e:
+                errors.append(e)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            readers = [threading.Thread(target=run, args=(read,))
+                       for i in range(4)]
+            writers = [threading.Thread(target=run, args=(write, n))
+                       for n in range(4)]
+            for thread in readers + writers:
+                thread.start()
+            for thread in writers:
+                thread.join()
+            done.set()
+            for thread in readers:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(errors, [])
+        storage.flush()
+        reader = self.new_storage()
+        reader.reload()
+        self.assertEqual(reader.count(City), 0)
+        self.assertEqual(
+            dict((key, obj.to_dict()) for key, obj in reader.all().items()),
+            dict((key, obj.to_dict()) for key, obj in storage.all().items()))
+
+    def test_pinned_snapshot_ignores_later_changes(self):
+        """Test a thread reads the snapshot it pinned until it closes"""
+        lagos = State(name="Lagos")
+        ikeja = City(name="Ikeja", state_id=lagos.id)
+        self.storage.new(lagos)
+        self.storage.new(ikeja)
+        self.storage.pin()
+        abuja = State(name="Abuja")
+        thread = threading.Thread(target=lambda: (
+            self.storage.new(abuja),
+            self.storage.delete(ikeja)))
+        thread.start()
+        thread.join()
+        self.assertEqual(list(self.storage.all(State)),
+                         ["State." + lagos.id])
+        self.assertIsNone(self.storage.get(State, abuja.id))
+        self.assertIs(self.storage.get(City, ikeja.id), ikeja)
+        self.assertEqual(self.storage.count(), 2)
+        self.assertEqual(list(self.storage.all_by(City, "state_id",
+                                                  lagos.id)),
+                         ["City." + ikeja.id])
+        self.storage.close()
+        self.assertEqual(self.storage.count(State), 2)
+        self.assertIsNone(self.storage.get(City, ikeja.id))
+
+    def test_changes_share_untouched_buckets(self):
+        """Test a change copies only the bucket partitions it touches"""
+        for i in range(100):
+            self.storage.new(State(name="State {}".format(i)))
+            self.storage.new(City(name="City {}".format(i)))
+        states = self.storage.all(State)
+        cities = self.storage.all(City)
+        self.storage.new(City(name="Ikeja"))
+        self.assertIs(self.storage.all(State), states)
+        changed = self.storage.all(City)
+        self.assertEqual(len(changed), len(cities) + 1)
+        shared = sum(a is b for a, b in zip(cities._parts, changed._parts))
+        self.assertEqual(shared, len(cities._parts) - 1)
+
+    def test_pinned_snapshot_builds_lazy_records(self):
+        """Test a pinned snapshot reads records loaded lazily"""
+        lagos = State(name="Lagos")
+        self.storage.new(lagos)
+        self.storage.new(City(name="Ikeja", state_id=lagos.id))
+        self.storage.compact()
+        storage = self.new_storage(lazy=True)
+        storage.reload()
+        storage.pin()
+        storage.new(State(name="Abuja"))
+        self.assertEqual(list(storage.all(State)), ["State." + lagos.id])
+        self.assertEqual(storage.get(State, lagos.id).name, "Lagos")
+        self.assertEqual(len(storage.all_by(City, "state_id", lagos.id)),
+                         1)
+        storage.unpin()
+        self.assertEqual(storage.count(State), 2)
+
+
+class TestFileStorageFragments(FileStorageTestCase):
+    """Test the JSON text cached for the clean objects"""
+    def test_save_serializes_only_dirty_objects(self):
+        """Test clean objects are written from their cached JSON text"""
+        lagos = State(name="Lagos")
+        kano = State(name="Kano")
+        self.storage.new(lagos)
+        self.storage.new(kano)
+        self.storage.compact()
+        kano.name = "Kaduna"
+        with patch.object(State, "to_dict", autospec=True,
+                          side_effect=State.to_dict) as to_dict:
+            self.storage.compact()
+            self.assertEqual(to_dict.call_count, 1)
+            to_dict.reset_mock()
+            self.storage.compact()
+            self.assertEqual(to_dict.call_count, 0)
+        with open(self.path, "r") as f:
+            self.assertEqual(json.load(f), {
+                "State." + lagos.id: lagos.to_dict(),
+                "State." + kano.id: kano.to_dict()})
+
+
+class TestFileStorageLazy(FileStorageTestCase):
+    """Test the records built only when used"""
+    def test_lazy_reload_builds_objects_on_use(self):
+        """Test a lazy reload only builds the objects that are used"""
+        state = State(name="Lagos")
+        city = City(name="Ikeja", state_id=state.id)
+        self.storage.new(state)
+        self.storage.new(city)
+        self.storage.new(State(name="Kano"))
+        self.storage.compact()
+        lazy = self.new_storage(lazy=True)
+        lazy.reload()
+        self.assertEqual(lazy._FileStorage__objects, {})
+        self.assertEqual(lazy.count(State), 2)
+        self.assertEqual(lazy.count(), 3)
+        loaded = lazy.get(State, state.id)
+        self.assertEqual(list(lazy._FileStorage__objects),
+                         ["State." + state.id])
+        with patch("models.storage", lazy):
+            self.assertEqual([c.id for c in loaded.cities], [city.id])
+        self.assertEqual(len(lazy._FileStorage__objects), 2)
+        self.assertEqual(len(lazy.all(State)), 2)
+        self.assertEqual(lazy.count(), 3)
+
+    def test_lazy_save_keeps_unbuilt_records(self):
+        """Test records never used are still written back"""
+        for name in ("Lagos", "Kano"):
+            self.storage.new(State(name=name))
+        self.storage.compact()
+        lazy = self.new_storage(lazy=True)
+        lazy.reload()
+        lazy.new(State(name="Abuja"))
+        lazy.compact()
+        storage = self.new_storage()
+        storage.reload()
+        self.assertEqual(sorted(s.name for s in storage.all(State).values()),
+                         ["Abuja", "Kano", "Lagos"])
+
+    def test_lazy_save_reuses_record_text(self):
+        """Test unbuilt records are written back from the text they were
+        read from, without being encoded again"""
+        for name in ("Lagos", "Kano", "Abuja"):
+            self.storage.new(State(name=name))
+        self.storage.compact()
+        lazy = self.new_storage(lazy=True, journal=False)
+        lazy.reload()
+        with patch.object(file_storage.json, "dumps",
+                          wraps=json.dumps) as dumps:
+            lazy.compact()
+            encoded = [c for c in dumps.call_args_list
+                       if isinstance(c[0][0], dict)]
+            self.assertEqual(encoded, [])
+            lazy.new(State(name="Kano"))
+            lazy.compact()
+            encoded = [c for c in dumps.call_args_list
+                       if isinstance(c[0][0], dict)]
+            self.assertEqual(len(encoded), 1)
+        storage = self.new_storage()
+        storage.reload()
+        self.assertEqual(sorted(s.name for s in storage.all(State).values()),
+                         ["Abuja", "Kano", "Kano", "Lagos"])
+
+
+class TestFileStorageShards(FileStorageTestCase):
+    """Test the snapshot split in hash shards"""
+    def shard_files(self):
+        """Returns the names of the shard files"""
+        return sorted(os.listdir(self.path + ".d"))
+
+    def test_sharded_save_touches_changed_shards(self):
+        """Test a sharded save rewrites only the shards that changed"""
+        storage = self.new_storage(shards=4, journal=False)
+        states = [State(name=str(i)) for i in range(20)]
+        for state in states:
+            storage.new(state)
+        storage.new(City(name="Ikeja", state_id=states[0].id))
+        storage.save()
+        self.assertEqual(len(self.shard_files()), 5)
+        self.assertTrue(all(name.endswith("-of-4.json")
+                            for name in self.shard_files()))
+        states[3].name = "changed"
+        with patch("models.engine.file_storage.os.replace",
+                   wraps=os.replace) as replace:
+            storage.save()
+        self.assertEqual(replace.call_count, 1)
+        shard = replace.call_args[0][1]
+        with open(shard, "r") as f:
+            self.assertIn("State." + states[3].id, json.load(f))
+
+    def test_sharded_reload(self):
+        """Test the shards are loaded back, in this process or in forked
+        workers"""
+        storage = self.new_storage(shards=3, journal=False)
+        for i in range(30):
+            storage.new(State(name=str(i)))
+        storage.save()
+        for workers in (0, 3):
+            for lazy in (False, True):
+                with self.subTest(workers=workers, lazy=lazy):
+                    loaded = self.new_storage(lazy=lazy, shards=3,
+                                              reload_workers=workers)
+                    with patch("models.engine.file_storage.threading."
+                               "active_count", return_value=1):
+                        loaded.reload()
+                    self.assertEqual(loaded.count(State), 30)
+                    self.assertEqual(
+                        sorted(s.name for s in loaded.all(State).values()),
+                        sorted(str(i) for i in range(30)))
+
+    def test_workers_only_fork_a_single_thread_on_reload(self):
+        """Test no worker is forked by close() or beside other threads"""
+        storage = self.new_storage(shards=3, journal=False)
+        storage.new(State(name="Lagos"))
+        storage.save()
+        loaded = self.new_storage(shards=3, reload_workers=3)
+        with patch("models.engine.file_storage.ProcessPoolExecutor") as pool:
+            with patch("models.engine.file_storage.threading."
+                       "active_count", return_value=2):
+                loaded.reload()
+            self.assertEqual(loaded.count(State), 1)
+            storage.new(State(name="Abuja"))
+            storage.save()
+            with patch("models.engine.file_storage.threading."
+                       "active_count", return_value=1):
+                loaded.close()
+            self.assertEqual(loaded.count(State), 2)
+            self.assertFalse(pool.called)
+
+    def test_sharded_journal_compaction(self):
+        """Test compaction rewrites the shards of journaled changes"""
+        storage = self.new_storage(shards=2)
+        state = State(name="Lagos")
+        storage.new(state)
+        storage.compact()
+        state.name = "Abuja"
+        storage.save()
+        storage.compact()
+        loaded = self.new_storage(shards=2)
+        loaded.reload()
+        self.assertEqual(loaded.get(State, state.id).name, "Abuja")
+
+    def test_sharded_compaction_after_reload(self):
+        """Test compacting the shards keeps the changes journaled before
+        the storage was reloaded"""
+        storage = self.new_storage(shards=2)
+        state = State(name="Lagos")
+        storage.new(state)
+        storage.compact()
+        state.name = "Abuja"
+        storage.new(State(name="Kano"))
+        storage.save()
+        loaded = self.new_storage(shards=2)
+        loaded.reload()
+        loaded.compact()
+        loaded = self.new_storage(shards=2)
+        loaded.reload()
+        self.assertEqual(sorted(s.name for s in loaded.all(State).values()),
+                         ["Abuja", "Kano"])
+        loaded.new(State(id="oyo", name="Oyo"))
+        loaded.save()
+        loaded = self.new_storage(shards=2, compact_every=2)
+        loaded.reload()
+        loaded.new(State(id="ogun", name="Ogun"))
+        loaded.save()
+        self.assertEqual(self.read_log(), [])
+        loaded = self.new_storage(shards=2)
+        loaded.reload()
+        self.assertEqual(sorted(s.name for s in loaded.all(State).values()),
+                         ["Abuja", "Kano", "Ogun", "Oyo"])
+
+    def test_changing_layout_migrates_files(self):
+        """Test switching between file.json and shards keeps the data"""
+        self.storage.new(State(name="Lagos"))
+        self.storage.new(City(name="Ikeja"))
+        self.storage.compact()
+        for shards in (4, 2):
+            storage = self.new_storage(shards=shards)
+            storage.reload()
+            storage.compact()
+            self.assertFalse(os.path.exists(self.path))
+            self.assertEqual(len(self.shard_files()), 2)
+            self.assertTrue(all(name.endswith("-of-{}.json".format(shards))
+                                for name in self.shard_files()))
+        storage = self.new_storage()
+        storage.reload()
+        self.assertEqual(storage.count(), 2)
+        storage.compact()
+        self.assertTrue(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.path + ".d"))
+
+
+class TestFileStorageBinary(FileStorageTestCase):
+    """Test the binary snapshot"""
+    def test_binary_format(self):
+        """Test the binary snapshot keeps every attribute and datetime"""
+        storage = self.new_storage(format="binary", journal=False)
+        place = Place(name="Loft", max_guest=3, latitude=1.5,
+                      amenity_ids=["a"])
+        storage.new(place)
+        storage.new(State(name="Lagos"))
+        storage.save()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertTrue(os.path.exists(self.path[:-5] + ".bin"))
+        for lazy in (False, True):
+            with self.subTest(lazy=lazy):
+                loaded = self.new_storage(lazy=lazy, format="binary")
+                loaded.reload()
+                self.assertEqual(loaded.count(), 2)
+                copy = loaded.get(Place, place.id)
+                self.assertEqual(copy.to_dict(), place.to_dict())
+                self.assertEqual(copy.created_at, place.created_at)
+
+    def test_switching_format_keeps_unbuilt_records(self):
+        """Test records are carried between formats without being built"""
+        state = State(name="Lagos")
+        self.storage.new(state)
+        self.storage.compact()
+        for format in ("binary", "json", "binary"):
+            storage = self.new_storage(lazy=True, format=format)
+            storage.reload()
+            storage.compact()
+            self.assertEqual(storage._FileStorage__objects, {})
+        self.assertFalse(os.path.exists(self.path))
+        storage = self.new_storage()
+        storage.reload()
+        self.assertEqual(storage.get(State, state.id).to_dict(),
+                         state.to_dict())
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+"""
+Contains the TestJsonStreamDocs and TestIterItems classes
+"""
+
+import io
+import inspect
+import json
+from models.engine import json_stream
+import pep8
+import unittest
+iter_items = json_stream.iter_items
+
+
+class TestJsonStreamDocs(unittest.TestCase):
+    """Tests to check the documentation and style of json_stream"""
+    def test_pep8_conformance_json_stream(self):
+        """Test that models/engine/json_stream.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/json_stream.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_json_stream_module_docstring(self):
+        """Test for the json_stream.py module docstring"""
+        self.assertIsNot(json_stream.__doc__, None,
+                         "json_stream.py needs a docstring")
+        self.assertTrue(len(json_stream.__doc__) >= 1,
+                        "json_stream.py needs a docstring")
+
+    def test_iter_items_docstring(self):
+        """Test for the iter_items docstring"""
+        self.assertTrue(len(iter_items.__doc__) >= 1,
+                        "iter_items needs a docstring")
+
+
+class TestIterItems(unittest.TestCase):
+    """Test the iter_items function"""
+    def setUp(self):
+        """Build a JSON object laid out like file.json"""
+        self.objects = {}
+        for i in range(20):
+            self.objects["Place.{}".format(i)] = {
+                "__class__": "Place",
+                "id": str(i),
+                "name": 'a "quoted" {brace}, colon: ' * i,
+                "amenity_ids": ["a", "b"],
+                "latitude": i / 3,
+                "description": None}
+
+    def test_matches_json_load(self):
+        """Test every chunk size yields the same items as json.load"""
+        for indent in (None, 4):
+            text = json.dumps(self.objects, indent=indent)
+            for chunk_size in (1, 2, 5, 64, 65536):
+                with self.subTest(indent=indent, chunk_size=chunk_size):
+                    items = iter_items(io.StringIO(text), chunk_size)
+                    self.assertEqual(dict(items), self.objects)
+
+    def test_text_of_values(self):
+        """Test text=True also yields the JSON text each value was read
+        from"""
+        text = json.dumps(self.objects, indent=4)
+        for chunk_size in (1, 7, 65536):
+            with self.subTest(chunk_size=chunk_size):
+                items = iter_items(io.StringIO(text), chunk_size, text=True)
+                for key, value, source in items:
+                    self.assertEqual(value, self.objects[key])
+                    self.assertEqual(json.loads(source), value)
+                    self.assertIn(source, text)
+
+    def test_yields_one_item_at_a_time(self):
+        """Test an item is yielded before the rest of the file is read"""
+        text = json.dumps(self.objects)
+        f = io.StringIO(text)
+        items = iter_items(f, 16)
+        self.assertEqual(next(items), ("Place.0", self.objects["Place.0"]))
+        self.assertLess(f.tell(), len(text))
+
+    def test_empty(self):
+        """Test an empty object or an empty file yields nothing"""
+        self.assertEqual(list(iter_items(io.StringIO(" {} \n"))), [])
+        self.assertEqual(list(iter_items(io.StringIO(""))), [])
+
+    def test_malformed(self):
+        """Test malformed or truncated files raise ValueError"""
+        for text in ('{"a": {"b": 1}', '{"a" {}}', '[1]', '{"a": {}, }',
+                     '{"a": {}'):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    list(iter_items(io.StringIO(text), 2))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+"""
+Contains the TestPaginationDocs and TestPagination classes
+"""
+
+import base64
+from datetime import datetime, timedelta
+import inspect
+import json
+import models
+from models.engine import pagination
+from models.state import State
+import pep8
+import unittest
+
+
+class TestPaginationDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the pagination
+    module"""
+    def test_pep8_conformance_pagination(self):
+        """Test that models/engine/pagination.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/pagination.py',
+                                    'tests/test_models/test_engine/'
+                                    'test_pagination.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pagination_module_docstring(self):
+        """Test for the pagination.py module docstring"""
+        self.assertTrue(len(pagination.__doc__ or "") >= 1,
+                        "pagination.py needs a docstring")
+
+    def test_pagination_func_docstrings(self):
+        """Test for the presence of docstrings in pagination functions"""
+        for name, func in inspect.getmembers(pagination,
+                                             inspect.isfunction):
+            if func.__module__ == pagination.__name__:
+                self.assertTrue(len(func.__doc__ or "") >= 1,
+                                "{:s} needs a docstring".format(name))
+
+
+class TestPagination(unittest.TestCase):
+    """Test the cursors and paginate"""
+    def setUp(self):
+        """Create states sharing creation times and names"""
+        start = datetime(2020, 1, 1)
+        self.states = [State(id="s{}".format(i), name="N{}".format(i % 3),
+                             created_at=start + timedelta(seconds=i // 2))
+                       for i in range(7)]
+
+    def walk(self, limit, order):
+        """Returns the ids of every page"""
+        pages, after = [], None
+        while True:
+            page, after = pagination.paginate(self.states[::-1], limit,
+                                              after, order)
+            pages.append([state.id for state in page])
+            if after is None:
+                return pages
+
+    def test_pages_by_creation(self):
+        """Test pages follow (created_at, id) without gaps or repeats"""
+        self.assertEqual(self.walk(3, "created_at"),
+                         [["s0", "s1", "s2"], ["s3", "s4", "s5"], ["s6"]])
+        self.assertEqual(self.walk(7, "created_at"),
+                         [["s0", "s1", "s2", "s3", "s4", "s5", "s6"]])
+
+    def test_pages_by_name(self):
+        """Test pages follow (name, id)"""
+        self.assertEqual(self.walk(4, "name"),
+                         [["s0", "s3", "s6", "s1"], ["s4", "s2", "s5"]])
+
+    def test_cursor_round_trip(self):
+        """Test a cursor gives back the key of its object"""
+        state = self.states[3]
+        for order in pagination.ORDERS:
+            cursor = pagination.cursor(state, order)
+            self.assertNotIn("=", cursor)
+            self.assertEqual(pagination.position(cursor, order),
+                             (getattr(state, order), state.id))
+
+    def test_invalid_cursor(self):
+        """Test position raises ValueError on a string not a cursor"""
+        cursor = pagination.cursor(self.states[0], "name")
+        for bad in ("", "!!", "bm9wZQ", cursor):
+            with self.assertRaises(ValueError):
+                pagination.position(bad, "created_at")
+
+    def test_cursor_of_wrong_types(self):
+        """Test position raises ValueError on a cursor whose value or id
+        is not of the type of the order"""
+        for key in ([1, "x"], [["N1"], "x"], ["N1", 5], ["N1", None]):
+            bad = base64.urlsafe_b64encode(json.dumps(key).encode())
+            with self.assertRaises(ValueError):
+                pagination.position(bad.decode(), "name")
+
+    def test_pages_with_unset_names(self):
+        """Test states without a name come first in name order"""
+        self.states[5].name = None
+        self.states[2].name = None
+        self.assertEqual(self.walk(3, "name"),
+                         [["s2", "s5", "s0"], ["s3", "s6", "s1"], ["s4"]])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_bad_cursor_is_bad_request(self):
+        """Test a cursor of the wrong types gives a 400 error"""
+        from api.v1.app import app
+        after = base64.urlsafe_b64encode(b'[1, "x"]').decode()
+        response = app.test_client().get("/api/v1/states", query_string={
+            "limit": 1, "order": "name", "after": after})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json(), {"error": "Invalid cursor"})
+
+if __name__ == "__main__":
+    unittest.main()
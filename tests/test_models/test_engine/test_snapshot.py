@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+"""
+Contains the TestBucketDocs and TestBucket classes
+"""
+
+import inspect
+from models.engine import snapshot
+import pep8
+import unittest
+Bucket = snapshot.Bucket
+
+
+class TestBucketDocs(unittest.TestCase):
+    """Tests to check the documentation and style of Bucket class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.funcs = [(name, func) for name, func in vars(Bucket).items()
+                     if inspect.isfunction(func)]
+
+    def test_pep8_conformance_snapshot(self):
+        """Test that models/engine/snapshot.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/snapshot.py',
+                                    'tests/test_models/test_engine/'
+                                    'test_snapshot.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_snapshot_module_docstring(self):
+        """Test for the snapshot.py module docstring"""
+        self.assertTrue(len(snapshot.__doc__ or "") >= 1,
+                        "snapshot.py needs a docstring")
+
+    def test_bucket_class_docstring(self):
+        """Test for the Bucket class docstring"""
+        self.assertTrue(len(Bucket.__doc__ or "") >= 1,
+                        "Bucket class needs a docstring")
+
+    def test_bucket_func_docstrings(self):
+        """Test for the presence of docstrings in Bucket methods"""
+        for func in self.funcs:
+            self.assertTrue(len(func[1].__doc__ or "") >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestBucket(unittest.TestCase):
+    """Test the Bucket class"""
+    def make(self, count):
+        """Returns a frozen bucket mapping "key <i>" to i"""
+        bucket = Bucket().edit()
+        for i in range(count):
+            bucket["key {}".format(i)] = i
+        bucket.freeze()
+        return bucket
+
+    def test_mapping(self):
+        """Test a bucket reads like a dictionary"""
+        bucket = self.make(200)
+        self.assertEqual(len(bucket), 200)
+        self.assertEqual(bucket["key 7"], 7)
+        self.assertIn("key 199", bucket)
+        self.assertNotIn("key 200", bucket)
+        self.assertIsNone(bucket.get("key 200"))
+        self.assertEqual(dict(bucket),
+                         dict(("key {}".format(i), i) for i in range(200)))
+        with self.assertRaises(KeyError):
+            bucket["key 200"]
+
+    def test_frozen_bucket_is_read_only(self):
+        """Test a frozen bucket can not be changed"""
+        bucket = self.make(3)
+        with self.assertRaises(TypeError):
+            bucket["key 3"] = 3
+        with self.assertRaises(TypeError):
+            bucket.pop("key 0")
+
+    def test_edit_shares_untouched_partitions(self):
+        """Test an edited copy leaves the original alone and shares every
+        partition it did not change"""
+        bucket = self.make(1000)
+        copy = bucket.edit()
+        copy["key 1000"] = 1000
+        self.assertEqual(copy.pop("key 0"), 0)
+        self.assertIsNone(copy.pop("key 0"))
+        copy.freeze()
+        self.assertEqual(len(bucket), 1000)
+        self.assertIn("key 0", bucket)
+        self.assertNotIn("key 1000", bucket)
+        self.assertEqual(len(copy), 1000)
+        self.assertNotIn("key 0", copy)
+        shared = sum(a is b for a, b in zip(bucket._parts, copy._parts))
+        self.assertGreaterEqual(shared, snapshot.PARTS - 2)
+
+if __name__ == "__main__":
+    unittest.main()
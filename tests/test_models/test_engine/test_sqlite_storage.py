@@ -0,0 +1,528 @@
+#!/usr/bin/python3
+"""
+Contains the TestSQLiteStorageDocs and TestSQLiteStorage classes
+"""
+
+from contextlib import contextmanager
+import importlib
+import inspect
+import json
+import models
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+import os
+import pep8
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+
+
+class TestSQLiteStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of SQLiteStorage class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        from models.engine import sqlite_storage
+        cls.module = sqlite_storage
+        cls.funcs = inspect.getmembers(sqlite_storage.SQLiteStorage,
+                                       inspect.isfunction)
+
+    def test_pep8_conformance_sqlite_storage(self):
+        """Test that models/engine/sqlite_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_sqlite_storage_module_docstring(self):
+        """Test for the sqlite_storage.py module docstring"""
+        self.assertTrue(len(self.module.__doc__ or "") >= 1,
+                        "sqlite_storage.py needs a docstring")
+
+    def test_sqlite_storage_func_docstrings(self):
+        """Test for the presence of docstrings in SQLiteStorage methods"""
+        for func in self.funcs:
+            self.assertTrue(len(func[1].__doc__ or "") >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestSQLiteStorage(unittest.TestCase):
+    """Test SQLiteStorage against a temporary database file"""
+    def setUp(self):
+        """Open a storage on an empty database file"""
+        from models.engine.sqlite_storage import SQLiteStorage
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "hbnb.db")
+        with patch.dict(os.environ, {"HBNB_SQLITE_DB": self.path}):
+            self.storage = SQLiteStorage()
+        self.storage.reload()
+        self.engine = self.storage._DBStorage__engine
+
+    def tearDown(self):
+        """Close the storage and remove the database file"""
+        self.storage.close()
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    @contextmanager
+    def statements(self):
+        """Records the SQL statements run during the block in a list"""
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            """records a statement"""
+            statements.append(statement)
+        event.listen(self.engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(self.engine, "before_cursor_execute", record)
+
+    def test_new_save_get_count_delete(self):
+        """Test the storage interface round trip"""
+        state = State(name="Lagos")
+        city = City(name="Ikeja", state_id=state.id)
+        for obj in (state, city, Amenity(name="Wifi")):
+            self.storage.new(obj)
+        self.storage.save()
+        self.storage.close()
+        self.assertEqual(self.storage.get(State, state.id).name, "Lagos")
+        self.assertEqual(self.storage.count(), 3)
+        self.assertEqual(self.storage.count(City), 1)
+        self.assertEqual(list(self.storage.all(City)), ["City." + city.id])
+        self.assertEqual([c.id for c in self.storage.get(
+            State, state.id).cities], [city.id])
+        self.storage.delete(self.storage.get(City, city.id))
+        self.storage.save()
+        self.assertEqual(self.storage.count(City), 0)
+
+    def test_iter_all_batches(self):
+        """Test iter_all yields every row across several batches"""
+        states = [State(name=str(i)) for i in range(5)]
+        for state in states:
+            self.storage.new(state)
+        self.storage.new(Amenity(name="Wifi"))
+        self.storage.save()
+        ids = [s.id for s in self.storage.iter_all(State, batch=2)]
+        self.assertEqual(ids, sorted(s.id for s in states))
+        self.assertEqual(len(list(self.storage.iter_all(batch=2))), 6)
+        self.assertEqual(list(self.storage.iter_all(City)), [])
+
+    def test_to_dict_leaves_out_relationships(self):
+        """Test to_dict of an object whose relationship was loaded has
+        only its columns"""
+        state = State(name="Lagos")
+        self.storage.new(state)
+        self.storage.new(City(name="Ikeja", state_id=state.id))
+        self.storage.save()
+        self.storage.close()
+        state = self.storage.get(State, state.id)
+        self.assertEqual(len(state.cities), 1)
+        new_d = state.to_dict()
+        self.assertNotIn("cities", new_d)
+        self.assertEqual(new_d["name"], "Lagos")
+        json.dumps(new_d)
+
+    def test_places_search_by_amenities_alone(self):
+        """Test a places search by amenities alone filters every place"""
+        from api.v1.app import app
+        from models.place import Place
+        from models.user import User
+        user = User(email="a@b.c", password="pwd")
+        state = State(name="Lagos")
+        city = City(name="Ikeja", state_id=state.id)
+        wifi, pool = Amenity(name="Wifi"), Amenity(name="Pool")
+        places = [Place(name=str(i), city_id=city.id, user_id=user.id)
+                  for i in range(3)]
+        places[0].amenities.extend([wifi, pool])
+        places[1].amenities.append(wifi)
+        for obj in [user, state, city, wifi, pool] + places:
+            self.storage.new(obj)
+        self.storage.save()
+        self.storage.close()
+        views = sys.modules["api.v1.views.places"]
+        with patch.object(views, "storage", self.storage):
+            client = app.test_client()
+            found = client.post("/api/v1/places_search",
+                                json={"amenities": [wifi.id]}).get_json()
+            self.assertEqual(sorted(p["name"] for p in found), ["0", "1"])
+            found = client.post("/api/v1/places_search", json={
+                "amenities": [wifi.id, pool.id]}).get_json()
+            self.assertEqual([p["name"] for p in found], ["0"])
+
+    def test_count_many_is_one_query(self):
+        """Test count_many counts every class in a single statement"""
+        for obj in (State(name="Lagos"), State(name="Oyo"),
+                    Amenity(name="Wifi")):
+            self.storage.new(obj)
+        self.storage.save()
+        with self.statements() as statements:
+            counts = self.storage.count_many()
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(counts, {"Amenity": 1, "City": 0, "Place": 0,
+                                  "Review": 0, "State": 2, "User": 0})
+        self.assertEqual(self.storage.count_many([State], approximate=True),
+                         {"State": 2})
+        self.assertEqual(self.storage.count(), 3)
+
+    def test_get_uses_identity_map(self):
+        """Test get does not query an object the session holds"""
+        state = State(name="Lagos")
+        self.storage.new(state)
+        self.storage.save()
+        self.storage.close()
+        with self.statements() as statements:
+            first = self.storage.get(State, state.id)
+            again = self.storage.get(State, state.id)
+        self.assertIs(first, again)
+        self.assertEqual(len(statements), 1)
+        self.assertIsNone(self.storage.get(State, "missing"))
+
+    def test_get_many(self):
+        """Test get_many fetches a batch in one query, in order"""
+        states = [State(name=str(i)) for i in range(4)]
+        for state in states:
+            self.storage.new(state)
+        self.storage.save()
+        self.storage.close()
+        held = self.storage.get(State, states[1].id)
+        ids = [states[2].id, "missing", states[1].id, states[0].id]
+        with self.statements() as statements:
+            found = self.storage.get_many(State, ids)
+        self.assertEqual([s.id for s in found],
+                         [states[2].id, states[1].id, states[0].id])
+        self.assertIs(found[1], held)
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(self.storage.get_many(State, []), [])
+
+    def make_states(self, states=3):
+        """Saves states each with two cities of two places with two
+        amenities, then starts a new session"""
+        user = User(email="a@b.c", password="pwd")
+        amenities = [Amenity(name="Wifi"), Amenity(name="Pool")]
+        for obj in [user] + amenities:
+            self.storage.new(obj)
+        for i in range(states):
+            state = State(name="S{}".format(i))
+            self.storage.new(state)
+            for j in range(2):
+                city = City(name="C{}".format(j), state_id=state.id)
+                self.storage.new(city)
+                for k in range(2):
+                    place = Place(name="P{}".format(k), city_id=city.id,
+                                  user_id=user.id)
+                    place.amenities.extend(amenities)
+                    self.storage.new(place)
+        self.storage.save()
+        self.storage.close()
+
+    def client(self, name):
+        """Returns a test client of the Flask app of module name, with the
+        views of the web apps and of the API reading this storage"""
+        module = importlib.import_module(name)
+        for key, view in list(sys.modules.items()):
+            if key.split(".")[0] in ("api", "web_flask") and \
+                    getattr(view, "storage", None) is models.storage:
+                patcher = patch.object(view, "storage", self.storage)
+                patcher.start()
+                self.addCleanup(patcher.stop)
+        return module.app.test_client()
+
+    def test_cities_by_states_queries(self):
+        """Test the states and cities page takes two queries"""
+        self.make_states()
+        client = self.client("web_flask.8-cities_by_states")
+        with self.statements() as statements:
+            response = client.get("/cities_by_states")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_data(as_text=True).count("<B>C"), 6)
+        self.assertEqual(len(statements), 2)
+
+    def test_hbnb_filters_queries(self):
+        """Test the filters page takes three queries"""
+        self.make_states()
+        client = self.client("web_flask.10-hbnb_filters")
+        with self.statements() as statements:
+            response = client.get("/hbnb_filters")
+        page = response.get_data(as_text=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(page.count("<li>C"), 6)
+        self.assertEqual(page.count("<li>Wifi</li>"), 1)
+        self.assertEqual(len(statements), 3)
+
+    def test_places_search_by_states_queries(self):
+        """Test a places search by states and amenities takes a query per
+        level, whatever the number of states"""
+        self.make_states(4)
+        body = {"states": [s.id for s in self.storage.all(State).values()],
+                "amenities": list(a.id for a in
+                                  self.storage.all(Amenity).values())}
+        self.storage.close()
+        client = self.client("api.v1.app")
+        with self.statements() as statements:
+            response = client.post("/api/v1/places_search", json=body)
+            places = response.get_json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(places), 16)
+        self.assertEqual(len(statements), 4)
+
+    def test_places_search_all_queries(self):
+        """Test a places search by amenities alone takes a query for the
+        amenities and two for the places and theirs"""
+        self.make_states()
+        body = {"amenities": list(a.id for a in
+                                  self.storage.all(Amenity).values())}
+        self.storage.close()
+        client = self.client("api.v1.app")
+        with self.statements() as statements:
+            response = client.post("/api/v1/places_search", json=body)
+            places = response.get_json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(places), 12)
+        self.assertEqual(len(statements), 3)
+
+    def test_streamed_response_closes_once(self):
+        """Test a streamed list closes the session once, when it ends"""
+        self.make_states()
+        client = self.client("api.v1.app")
+        with patch.object(self.storage, "close",
+                          wraps=self.storage.close) as close:
+            response = client.get("/api/v1/states", buffered=False)
+            self.assertEqual(close.call_count, 0)
+            states = json.loads(b"".join(response.response))
+            response.close()
+            self.assertEqual(close.call_count, 1)
+        self.assertEqual(len(states), 3)
+
+    def test_iter_all_loads_per_batch(self):
+        """Test iter_all with load takes two queries per batch"""
+        self.make_states()
+        with self.statements() as statements:
+            places = [p for p in self.storage.iter_all(
+                Place, batch=5, load=["amenities"]) if len(p.amenities) == 2]
+        self.assertEqual(len(places), 12)
+        self.assertEqual(len(statements), 6)
+
+    def test_bulk_save(self):
+        """Test bulk_save inserts parents first, batch rows at a time, a
+        statement per set of columns, leaving the others to their
+        defaults"""
+        state = State(name="Lagos")
+        cities = [City(name=str(i), state_id=state.id) for i in range(5)]
+        self.storage.bulk_new(cities)
+        self.storage.bulk_new([state])
+        with self.statements() as statements:
+            self.storage.bulk_save(batch=2)
+        inserts = [s for s in statements if s.startswith("INSERT")]
+        self.assertEqual(len(inserts), 4)
+        self.assertIn("states", inserts[0])
+        self.storage.close()
+        self.assertEqual(self.storage.count(City), 5)
+        self.assertEqual(len(self.storage.get(State, state.id).cities), 5)
+        user = User(email="a@b.c", password="pwd")
+        loft = Place(name="Loft", city_id=cities[0].id, user_id=user.id)
+        flat = Place(name="Flat", city_id=cities[0].id, user_id=user.id,
+                     number_rooms=3)
+        self.storage.bulk_new([loft, flat, user])
+        with self.statements() as statements:
+            self.storage.bulk_save()
+        inserts = [s for s in statements if s.startswith("INSERT")]
+        self.assertEqual(len(inserts), 3)
+        self.storage.close()
+        loft = self.storage.get(Place, loft.id)
+        self.assertEqual((loft.number_rooms, loft.max_guest), (0, 0))
+        self.assertIsNone(loft.latitude)
+        self.assertEqual(self.storage.get(Place, flat.id).number_rooms, 3)
+
+    def test_replicas(self):
+        """Test reads go to the replica in HBNB_MYSQL_REPLICAS, and to the
+        primary after a write or use_primary()"""
+        from models.base_model import Base
+        from models.engine.sqlite_storage import SQLiteStorage
+        replica = os.path.join(self.tmp.name, "replica.db")
+        env = {"HBNB_SQLITE_DB": self.path,
+               "HBNB_MYSQL_REPLICAS": "sqlite:///" + replica}
+        with patch.dict(os.environ, env):
+            storage = SQLiteStorage()
+        storage.reload()
+        replica_engine = storage._DBStorage__replicas[0]
+        Base.metadata.create_all(replica_engine)
+        state = State(name="Lagos")
+        storage.new(state)
+        storage.save()
+        self.assertIs(storage.get(State, state.id), state)
+        self.assertEqual(storage.count(State), 1)
+        storage.close()
+        self.assertIsNone(storage.get(State, state.id))
+        self.assertEqual(storage.count(State), 0)
+        storage.close()
+        storage.use_primary()
+        self.assertEqual(storage.get(State, state.id).name, "Lagos")
+        storage.close()
+        storage._DBStorage__engine.dispose()
+        replica_engine.dispose()
+
+    def test_page(self):
+        """Test page seeks each page of a class or of the children of an
+        object, in (order, id) order"""
+        self.make_states(3)
+        states = sorted(self.storage.all(State).values(),
+                        key=lambda s: (s.created_at, s.id))
+        self.storage.close()
+        ids, after = [], None
+        with self.statements() as statements:
+            while True:
+                page, after = self.storage.page(State, 2, after)
+                ids += [state.id for state in page]
+                if after is None:
+                    break
+        self.assertEqual(ids, [state.id for state in states])
+        self.assertEqual(len(statements), 2)
+        cities, after = self.storage.page(City, 5, order="name",
+                                          attr="state_id",
+                                          value=states[1].id)
+        self.assertEqual([c.name for c in cities], ["C0", "C1"])
+        self.assertIsNone(after)
+        with self.assertRaises(ValueError):
+            self.storage.page(State, 2, "nope")
+
+    def test_fields_select_only_their_columns(self):
+        """Test iter_all, page and get select only the listed columns"""
+        self.make_states(2)
+        state_id = next(iter(self.storage.all(State))).split(".")[1]
+        self.storage.close()
+        with self.statements() as statements:
+            states = list(self.storage.iter_all(State, fields=["name"]))
+            self.storage.page(State, 1, fields=["name"])
+            self.storage.close()
+            state = self.storage.get(State, state_id, fields=["name"])
+        self.assertEqual(len(states), 2)
+        self.assertEqual(state.to_dict(["id", "name", "created_at"]),
+                         {"id": state_id, "name": state.name})
+        for statement in statements:
+            columns = statement.split(" FROM ")[0]
+            self.assertIn("states.name", columns)
+            self.assertNotIn("states.updated_at", columns)
+        self.assertIn("states.created_at", statements[1].split(" FROM ")[0])
+
+    def test_wal_mode(self):
+        """Test connections use write-ahead logging"""
+        with self.engine.connect() as connection:
+            mode = connection.execute(text("PRAGMA journal_mode")).scalar()
+        self.assertEqual(mode, "wal")
+
+    def test_foreign_keys_are_indexed(self):
+        """Test an index is created on each foreign key column"""
+        with self.engine.connect() as connection:
+            names = set(connection.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )).scalars())
+        for name in ("ix_cities_state_id", "ix_places_city_id",
+                     "ix_places_user_id", "ix_reviews_place_id",
+                     "ix_reviews_user_id", "ix_states_name",
+                     "ix_cities_name", "ix_amenities_name",
+                     "ix_place_amenity_amenity_id_place_id"):
+            self.assertIn(name, names)
+
+    def test_missing_indexes_are_created(self):
+        """Test reload adds the indexes missing from existing tables"""
+        with self.engine.begin() as connection:
+            connection.execute(text("DROP INDEX ix_cities_state_id"))
+            connection.execute(text("DROP INDEX ix_states_name"))
+        self.storage.close()
+        self.storage.reload()
+        with self.engine.connect() as connection:
+            names = set(connection.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )).scalars())
+        self.assertIn("ix_cities_state_id", names)
+        self.assertIn("ix_states_name", names)
+
+    def test_child_lists_use_an_index(self):
+        """Test the query loading each list of children searches an index
+        instead of scanning a table"""
+        self.make_states(1)
+        place = next(iter(self.storage.all(Place).values()))
+        self.storage.new(Review(text="Good", place_id=place.id,
+                                user_id=place.user_id))
+        self.storage.save()
+        lists = [(State, "cities"), (City, "places"), (User, "places"),
+                 (Place, "reviews"), (User, "reviews"),
+                 (Amenity, "place_amenities")]
+        for cls, attr in lists:
+            self.storage.close()
+            parent = next(iter(self.storage.all(cls).values()))
+            queries = []
+
+            def record(conn, cursor, statement, parameters, *args):
+                """records a statement and its parameters"""
+                queries.append((statement, parameters))
+            event.listen(self.engine, "before_cursor_execute", record)
+            getattr(parent, attr)
+            event.remove(self.engine, "before_cursor_execute", record)
+            with self.subTest(list="{}.{}".format(cls.__name__, attr)):
+                self.assertEqual(len(queries), 1)
+                with self.engine.connect() as connection:
+                    plan = connection.exec_driver_sql(
+                        "EXPLAIN QUERY PLAN " + queries[0][0],
+                        queries[0][1]).all()
+                for row in plan:
+                    self.assertTrue(row[-1].startswith("SEARCH"), plan)
+
+    def test_pool_settings(self):
+        """Test the pool is configured from the HBNB_MYSQL_* variables"""
+        from models.engine.sqlite_storage import SQLiteStorage
+        env = {"HBNB_SQLITE_DB": self.path, "HBNB_MYSQL_POOL_SIZE": "3",
+               "HBNB_MYSQL_MAX_OVERFLOW": "2",
+               "HBNB_MYSQL_POOL_RECYCLE": "60",
+               "HBNB_MYSQL_POOL_TIMEOUT": "0.5",
+               "HBNB_MYSQL_PRE_PING": "0"}
+        with patch.dict(os.environ, env):
+            storage = SQLiteStorage()
+        engine = storage._DBStorage__engine
+        self.assertEqual(engine.pool.size(), 3)
+        self.assertEqual(engine.pool._max_overflow, 2)
+        self.assertEqual(engine.pool._recycle, 60)
+        self.assertEqual(engine.pool._timeout, 0.5)
+        self.assertFalse(engine.pool._pre_ping)
+        self.assertTrue(self.engine.pool._pre_ping)
+        engine.dispose()
+
+    def test_pool_metrics(self):
+        """Test the storage reports the metrics of its pool"""
+        self.storage.count(State)
+        metrics = self.storage.pool_metrics()
+        self.assertGreaterEqual(metrics["checkouts"], 1)
+        self.assertEqual(metrics["checked_out"], 1)
+        self.storage.close()
+        self.assertEqual(self.storage.pool_metrics()["checked_out"], 0)
+
+    def test_statement_timeout(self):
+        """Test a statement running past HBNB_MYSQL_STATEMENT_TIMEOUT is
+        interrupted"""
+        from models.engine.sqlite_storage import SQLiteStorage
+        env = {"HBNB_SQLITE_DB": self.path,
+               "HBNB_MYSQL_STATEMENT_TIMEOUT": "50"}
+        with patch.dict(os.environ, env):
+            storage = SQLiteStorage()
+        engine = storage._DBStorage__engine
+        slow = text("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL "
+                    "SELECT i + 1 FROM n WHERE i < 100000000) "
+                    "SELECT count(*) FROM n")
+        with engine.connect() as connection:
+            with self.assertRaises(OperationalError):
+                connection.execute(slow)
+            self.assertEqual(connection.execute(text("SELECT 1")).scalar(),
+                             1)
+        engine.dispose()
+
+if __name__ == "__main__":
+    unittest.main()
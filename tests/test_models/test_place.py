@@ -7,6 +7,7 @@ from datetime import datetime
 import inspect
 import models
 from models import place
+from models.amenity import Amenity
 from models.base_model import BaseModel
 import pep8
 import unittest
@@ -171,6 +172,16 @@ class TestPlace(unittest.TestCase):
         self.assertEqual(type(place.amenity_ids), list)
         self.assertEqual(len(place.amenity_ids), 0)
 
+    @unittest.skipIf(models.storage_t == 'db', "not testing File Storage")
+    def test_amenities(self):
+        """Test amenities returns the stored amenities of amenity_ids"""
+        wifi = Amenity(name="Wifi")
+        models.storage.new(wifi)
+        self.addCleanup(models.storage.delete, wifi)
+        place = Place(amenity_ids=[wifi.id, "missing"])
+        self.assertEqual(place.amenities, [wifi])
+        self.assertEqual(Place().amenities, [])
+
     def test_to_dict_creates_dict(self):
         """test to_dict method creates a dictionary with proper attrs"""
         p = Place()